@@ -5,17 +5,9 @@
 import os
 import sys
 
-from argparse_manpage.manpage import Manpage
-
 LOCALDIR = os.path.dirname(os.path.realpath(__file__))
 ROOTDIR = os.path.normpath(os.path.join(LOCALDIR, ".."))
 
-# Prepend the project's toplevel directory to the search path so we import the
-# zeekclient package locally.
-sys.path.insert(0, ROOTDIR)
-
-import zeekclient.cli  # noqa: E402
-
 
 def main():
     # Set a fixed number of columns to avoid output discrepancies between
@@ -23,6 +15,22 @@ def main():
     # manpage is written to disk, not how it renders at the terminal.
     os.environ["COLUMNS"] = "200"
 
+    # The heavier imports happen here rather than at module level, so merely
+    # importing this script stays cheap.
+    try:
+        from argparse_manpage.manpage import Manpage
+    except ImportError:
+        print(
+            "error: this script requires the argparse-manpage package", file=sys.stderr
+        )
+        return 1
+
+    # Prepend the project's toplevel directory to the search path so we import
+    # the zeekclient package locally.
+    sys.path.insert(0, ROOTDIR)
+
+    import zeekclient.cli
+
     # Change the program name so the parsers report zeek-client, not build.py.
     sys.argv[0] = "zeek-client"
 
@@ -81,9 +89,13 @@ https://github.com/zeek/zeek-client/issues, or contact us on Discourse or Slack:
 https://zeek.org/community""",
     )
 
-    with open(os.path.join(LOCALDIR, "zeek-client.1"), "w", encoding="ascii") as hdl:
-        hdl.write(str(manpage))
+    # The rendered page is plain ASCII, so encode it once and write the bytes
+    # directly, bypassing the text layer's chunked re-encoding.
+    with open(os.path.join(LOCALDIR, "zeek-client.1"), "wb", buffering=1 << 16) as hdl:
+        hdl.write(str(manpage).encode("ascii"))
+
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
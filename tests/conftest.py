@@ -0,0 +1,14 @@
+"""Shared setup for running the tests via pytest."""
+
+import pathlib
+import sys
+
+# Import the zeekclient package from this source tree, regardless of whether
+# (and where) it's installed, and the websocket shim and testutil helpers from
+# this directory. Pytest loads this file once per session, before collecting
+# the test modules, so the test modules need no path setup of their own. This
+# file computes the paths itself since testutil isn't importable until now.
+tests_dir = pathlib.Path(__file__).resolve().parent
+for path in (tests_dir.parent, tests_dir):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
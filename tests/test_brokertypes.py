@@ -1,8 +1,11 @@
 """This verifies the behavior of the types provied by the brokertypes module."""
 
 import datetime
+import math
 import unittest
+import unittest.mock
 
+from zeekclient import brokertypes
 from zeekclient.brokertypes import (
     Address,
     Boolean,
@@ -29,6 +32,21 @@ from zeekclient.brokertypes import (
     unserialize,
 )
 
+# Commonly used values, created once for the container tests below. Brokertype
+# values compare by value, so sharing these instances across tests is safe.
+BOOL_TRUE = from_py(True)
+INT_1 = from_py(1)
+INT_2 = from_py(2)
+INT_3 = from_py(3)
+INT_42 = from_py(42)
+INT_43 = from_py(43)
+STR_AAA = from_py("aaa")
+STR_BAR = from_py("bar")
+STR_BAZ = from_py("baz")
+STR_FOO = from_py("foo")
+STR_HELLO = from_py("hello")
+STR_NOO = from_py("noo")
+
 
 class TestBrokertypes(unittest.TestCase):
     def assertEqualRoundtrip(self, data):  # noqa: N802
@@ -140,6 +158,11 @@ class TestBrokertypes(unittest.TestCase):
         self.assertEqual(Timespan(datetime.timedelta(hours=1)), Timespan("1h"))
         self.assertEqual(Timespan(datetime.timedelta(days=1)), Timespan("1d"))
         self.assertEqual(Timespan(datetime.timedelta(weeks=1)), Timespan("7d"))
+        # Long spans in small units need to remain exact:
+        self.assertEqual(
+            Timespan(datetime.timedelta(days=1000, microseconds=1)).to_broker()["data"],
+            "86400000000001000ns",
+        )
 
         self.assertNotEqual(Timespan("10s"), Timespan("20s"))
         self.assertNotEqual(Timespan("10s"), Timespan("10ms"))
@@ -291,6 +314,12 @@ class TestBrokertypes(unittest.TestCase):
         with self.assertRaises(TypeError):
             Port(10, "tcp")
 
+        # Malformed Broker port strings all raise ValueError, including ones
+        # lacking the protocol.
+        for data in ("80", "80/", "80/xyz", "x/tcp"):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                Port.from_broker({"@data-type": "port", "data": data})
+
         self.assertTrue(Port(10) < Port(20))
         self.assertTrue(Port(20) > Port(10))
         self.assertTrue(Port(20, Port.Proto.TCP) < Port(10, Port.Proto.UDP))
@@ -298,27 +327,27 @@ class TestBrokertypes(unittest.TestCase):
         self.assertHash(Port(10))
 
     def test_vector(self):
-        val = Vector([from_py(1), from_py("foo"), from_py(True)])
+        val = Vector([INT_1, STR_FOO, BOOL_TRUE])
 
         self.assertEqual(val, val)
         self.assertEqual(Vector([String("foo")]).to_py(), ["foo"])
         self.assertEqual(Vector([String("foo")]), from_py(["foo"]))
 
-        self.assertNotEqual(Vector([from_py(1), from_py("foo")]), Vector([from_py(1)]))
+        self.assertNotEqual(Vector([INT_1, STR_FOO]), Vector([INT_1]))
         self.assertNotEqual(
-            Vector([from_py(1), from_py("foo")]),
-            Vector([from_py(1), from_py("noo")]),
+            Vector([INT_1, STR_FOO]),
+            Vector([INT_1, STR_NOO]),
         )
 
-        self.assertEqualRoundtrip(Vector([from_py(1), from_py("foo"), from_py(True)]))
+        self.assertEqualRoundtrip(Vector([INT_1, STR_FOO, BOOL_TRUE]))
 
         for _ in val:
             pass
         self.assertEqual(len(val), 3)
         self.assertEqual(val[0], Integer(1))
 
-        self.assertTrue(Vector([from_py(1)]) < Vector([from_py(2)]))
-        self.assertTrue(Vector([from_py(1)]) < Vector([from_py(1), from_py("foo")]))
+        self.assertTrue(Vector([INT_1]) < Vector([INT_2]))
+        self.assertTrue(Vector([INT_1]) < Vector([INT_1, STR_FOO]))
         self.assertHash(val)
 
         for val in (23, [23]):
@@ -326,27 +355,27 @@ class TestBrokertypes(unittest.TestCase):
                 Vector(val)
 
     def test_set(self):
-        val = Set({from_py(1), from_py("foo"), from_py(True)})
+        val = Set({INT_1, STR_FOO, BOOL_TRUE})
 
         self.assertEqual(val, val)
         self.assertEqual(Set({String("foo")}).to_py(), {"foo"})
         self.assertEqual(Set({String("foo")}), from_py({"foo"}))
 
-        self.assertNotEqual(Set({from_py(1), from_py("foo")}), Set({from_py(1)}))
+        self.assertNotEqual(Set({INT_1, STR_FOO}), Set({INT_1}))
         self.assertNotEqual(
-            Set({from_py(1), from_py("foo")}),
-            Set({from_py(1), from_py("noo")}),
+            Set({INT_1, STR_FOO}),
+            Set({INT_1, STR_NOO}),
         )
 
-        self.assertEqualRoundtrip(Set({from_py(1), from_py("foo"), from_py(True)}))
+        self.assertEqualRoundtrip(Set({INT_1, STR_FOO, BOOL_TRUE}))
 
         for _ in val:
             pass
         self.assertEqual(len(val), 3)
         self.assertTrue(Integer(1) in val)
 
-        self.assertTrue(Set({from_py(1)}) < Set({from_py(2)}))
-        self.assertTrue(Set({from_py(1)}) < Set({from_py(1), from_py("foo")}))
+        self.assertTrue(Set({INT_1}) < Set({INT_2}))
+        self.assertTrue(Set({INT_1}) < Set({INT_1, STR_FOO}))
         self.assertHash(val)
 
         for val in (23, {23}):
@@ -354,26 +383,30 @@ class TestBrokertypes(unittest.TestCase):
                 Set(val)
 
     def test_table(self):
-        val = Table({from_py("foo"): from_py(1), from_py("bar"): from_py(2)})
+        val = Table({STR_FOO: INT_1, STR_BAR: INT_2})
 
         self.assertEqual(val, val)
         self.assertEqual(
-            Table({from_py("foo"): from_py(1), from_py("bar"): from_py(2)}).to_py(),
+            Table({STR_FOO: INT_1, STR_BAR: INT_2}).to_py(),
             {"foo": 1, "bar": 2},
         )
-        self.assertEqual(Table({from_py("foo"): from_py(1)}), from_py({"foo": 1}))
+        self.assertEqual(Table({STR_FOO: INT_1}), from_py({"foo": 1}))
+        self.assertEqual(
+            hash(Table({STR_FOO: INT_1, STR_BAR: INT_2})),
+            hash(Table({STR_BAR: INT_2, STR_FOO: INT_1})),
+        )
 
         self.assertNotEqual(
-            Table({from_py("foo"): from_py(1), from_py("bar"): from_py(2)}),
-            Table({from_py("foo"): from_py(1), from_py("bar"): from_py(3)}),
+            Table({STR_FOO: INT_1, STR_BAR: INT_2}),
+            Table({STR_FOO: INT_1, STR_BAR: INT_3}),
         )
         self.assertNotEqual(
-            Table({from_py("foo"): from_py(1), from_py("bar"): from_py(2)}),
-            Table({from_py("foo"): from_py(1), from_py("baz"): from_py(2)}),
+            Table({STR_FOO: INT_1, STR_BAR: INT_2}),
+            Table({STR_FOO: INT_1, STR_BAZ: INT_2}),
         )
 
         self.assertEqualRoundtrip(
-            Table({from_py("foo"): from_py(1), from_py("bar"): from_py(2)}),
+            Table({STR_FOO: INT_1, STR_BAR: INT_2}),
         )
         for _ in val:
             pass
@@ -387,22 +420,19 @@ class TestBrokertypes(unittest.TestCase):
         self.assertTrue(String("foo") in val)
 
         self.assertFalse(
-            Table({from_py("foo"): from_py(1)}) < Table({from_py("foo"): from_py(1)}),
+            Table({STR_FOO: INT_1}) < Table({STR_FOO: INT_1}),
         )
         self.assertTrue(
-            Table({from_py("foo"): from_py(1)}) < Table({from_py("foo"): from_py(2)}),
+            Table({STR_FOO: INT_1}) < Table({STR_FOO: INT_2}),
         )
         self.assertTrue(
-            Table({from_py("bar"): from_py(1)})
-            < Table({from_py("foo"): from_py(1), from_py("bar"): from_py(1)}),
+            Table({STR_BAR: INT_1}) < Table({STR_FOO: INT_1, STR_BAR: INT_1}),
         )
         self.assertTrue(
-            Table({from_py("foo"): from_py(1)})
-            < Table({from_py("foo"): from_py(1), from_py("bar"): from_py(2)}),
+            Table({STR_FOO: INT_1}) < Table({STR_FOO: INT_1, STR_BAR: INT_2}),
         )
         self.assertTrue(
-            Table({from_py("aaa"): from_py(1)})
-            < Table({from_py("foo"): from_py(1), from_py("bar"): from_py(2)}),
+            Table({STR_AAA: INT_1}) < Table({STR_FOO: INT_1, STR_BAR: INT_2}),
         )
         self.assertHash(val)
 
@@ -411,23 +441,23 @@ class TestBrokertypes(unittest.TestCase):
                 Table(val)
 
     def test_zeek_event(self):
-        evt = ZeekEvent("Test::event", from_py("hello"), from_py(42), from_py(True))
+        evt = ZeekEvent("Test::event", STR_HELLO, INT_42, BOOL_TRUE)
         self.assertTrue(isinstance(evt, Vector))
         self.assertEqual(
-            ZeekEvent("Test::event", from_py("hello"), from_py(42), from_py(True)),
-            ZeekEvent("Test::event", from_py("hello"), from_py(42), from_py(True)),
+            ZeekEvent("Test::event", STR_HELLO, INT_42, BOOL_TRUE),
+            ZeekEvent("Test::event", STR_HELLO, INT_42, BOOL_TRUE),
         )
         self.assertNotEqual(
-            ZeekEvent("Test::event", from_py("hello"), from_py(42), from_py(True)),
-            ZeekEvent("Test::event2", from_py("hello"), from_py(42), from_py(True)),
+            ZeekEvent("Test::event", STR_HELLO, INT_42, BOOL_TRUE),
+            ZeekEvent("Test::event2", STR_HELLO, INT_42, BOOL_TRUE),
         )
         self.assertNotEqual(
-            ZeekEvent("Test::event", from_py("hello"), from_py(42), from_py(True)),
-            ZeekEvent("Test::event", from_py("hello"), from_py(42)),
+            ZeekEvent("Test::event", STR_HELLO, INT_42, BOOL_TRUE),
+            ZeekEvent("Test::event", STR_HELLO, INT_42),
         )
         self.assertNotEqual(
-            ZeekEvent("Test::event", from_py("hello"), from_py(43)),
-            ZeekEvent("Test::event", from_py("hello"), from_py(42)),
+            ZeekEvent("Test::event", STR_HELLO, INT_43),
+            ZeekEvent("Test::event", STR_HELLO, INT_42),
         )
 
         self.assertEqualRoundtrip(evt)
@@ -446,7 +476,7 @@ class TestBrokertypes(unittest.TestCase):
         md_vec = Vector([Vector([from_py(12344242), from_py("truth")])])
         args_vec = Vector()
         ev_vec = Vector([from_py("Test::event"), args_vec, md_vec])
-        vec = Vector([from_py(1), from_py(1), ev_vec])
+        vec = Vector([INT_1, INT_1, ev_vec])
 
         ev = ZeekEvent.from_vector(vec)
         self.assertEqual(ev.name, "Test::event")
@@ -455,13 +485,13 @@ class TestBrokertypes(unittest.TestCase):
     def test_zeek_event_from_vector_invalid(self):
         test_cases = [
             ("missing args", Vector([from_py("Test::event")])),
-            ("wrong name type", Vector([from_py(1), Vector()])),
+            ("wrong name type", Vector([INT_1, Vector()])),
             ("wrong args type", Vector([from_py("Test::event"), from_py("string")])),
         ]
 
         for name, ev_vec in test_cases:
             with self.subTest(msg=name):
-                vec = Vector([from_py(1), from_py(1), ev_vec])
+                vec = Vector([INT_1, INT_1, ev_vec])
                 with self.assertRaises(TypeError):
                     ZeekEvent.from_vector(vec)
 
@@ -495,6 +525,21 @@ class TestBrokertypes(unittest.TestCase):
         )
         self.assertEqualRoundtrip(DataMessage("foo", String("test")))
 
+    def test_message_required_keys(self):
+        # With several keys missing, the error names the first one in the order
+        # each message type declares them.
+        for typ, data, key in (
+            (DataMessage, '{"type": "data-message", "data": 1}', "topic"),
+            (ErrorMessage, '{"type": "error"}', "code"),
+            (HandshakeAckMessage, '{"type": "ack", "version": "1"}', "endpoint"),
+        ):
+            with self.subTest(typ=typ.__name__):
+                with self.assertRaisesRegex(
+                    TypeError,
+                    f'invalid data layout for {typ.__name__}: required key "{key}"',
+                ):
+                    _ = typ.unserialize(data)
+
     def test_error_message(self):
         msg1 = ErrorMessage("deserialization_failed", "this is where you failed")
         msg2 = ErrorMessage("deserialization_failed", "this is where you also failed")
@@ -502,6 +547,75 @@ class TestBrokertypes(unittest.TestCase):
         self.assertNotEqual(msg1, msg2)
         self.assertEqualRoundtrip(msg1)
 
+    def test_container_source_mutation(self):
+        # Sets and tables cache their sorted members, so changes to the
+        # collection they got constructed from must not affect them.
+        members = {STR_FOO}
+        val = Set(members)
+        rendered = val.serialize()
+        members.add(STR_BAR)
+        self.assertEqual(len(val), 1)
+        self.assertEqual(val.serialize(), rendered)
+
+        members = {STR_FOO: INT_1}
+        val = Table(members)
+        rendered = val.serialize()
+        members[STR_BAR] = INT_2
+        self.assertEqual(len(val), 1)
+        self.assertEqual(val.serialize(), rendered)
+
+    def test_container_init_types(self):
+        # Containers default to empty when constructed without elements, but
+        # other values only work when they're of the right container type, even
+        # when empty.
+        self.assertEqual(len(Vector()), 0)
+        self.assertEqual(len(Set()), 0)
+        self.assertEqual(len(Table()), 0)
+        self.assertEqual(len(Vector(())), 0)
+        self.assertEqual(Vector(()), Vector([]))
+        self.assertEqual(Vector((INT_1, STR_FOO)), Vector([INT_1, STR_FOO]))
+
+        for typ, data in (
+            (Vector, 0),
+            (Vector, ""),
+            (Set, frozenset()),
+            (Set, []),
+            (Table, 0),
+            (Table, []),
+        ):
+            with self.subTest(typ=typ.__name__, data=data):
+                with self.assertRaisesRegex(TypeError, "initialization requires"):
+                    typ(data)
+
+    def test_eq_inherited_members(self):
+        # Equality covers members declared on base classes, not just the ones
+        # the instance's own class adds.
+        class TaggedString(String):
+            __slots__ = ("tag",)
+
+            def __init__(self, value, tag):
+                super().__init__(value)
+                self.tag = tag
+
+        self.assertEqual(TaggedString("foo", 1), TaggedString("foo", 1))
+        self.assertNotEqual(TaggedString("foo", 1), TaggedString("bar", 1))
+        self.assertNotEqual(TaggedString("foo", 1), TaggedString("foo", 2))
+
+        class PlainString(String):
+            pass
+
+        self.assertEqual(PlainString("foo"), PlainString("foo"))
+        self.assertNotEqual(PlainString("foo"), PlainString("bar"))
+
+        val1, val2 = PlainString("foo"), PlainString("foo")
+        val1.tag = 1
+        self.assertNotEqual(val1, val2)
+
+        self.assertNotEqual(
+            ZeekEvent("foo", STR_BAR),
+            ZeekEvent("foo", STR_BAZ),
+        )
+
     def test_type_lt(self):
         # Any brokertyped data value can be compared to any other, but not to
         # unrelated types.
@@ -547,6 +661,43 @@ class TestBrokertypes(unittest.TestCase):
         with self.assertRaisesRegex(TypeError, "invalid data for Count"):
             _ = Count.unserialize(data)
 
+    def json_loaders(self):
+        # The JSON parsers the module may use. orjson is optional, so it's
+        # only included when it's installed.
+        loaders = [("json", brokertypes.json.loads)]
+        if brokertypes.orjson is not None:
+            loaders.append(("orjson", brokertypes._orjson_loads))
+        return loaders
+
+    def test_unserialize_nonfinite_reals(self):
+        for name, loader in self.json_loaders():
+            with self.subTest(loader=name):
+                with unittest.mock.patch.object(brokertypes, "_json_loads", loader):
+                    self.assertEqualRoundtrip(Real(math.inf))
+                    self.assertEqualRoundtrip(Real(-math.inf))
+                    val = Real.unserialize(Real(math.nan).serialize())
+                    self.assertTrue(math.isnan(val.to_py()))
+                    val = unserialize(Vector([Real(math.nan)]).serialize())
+                    self.assertTrue(math.isnan(val[0].to_py()))
+
+    def test_unserialize_malformed_json(self):
+        messages = set()
+        for name, loader in self.json_loaders():
+            with self.subTest(loader=name):
+                with unittest.mock.patch.object(brokertypes, "_json_loads", loader):
+                    with self.assertRaisesRegex(TypeError, "cannot parse JSON") as ctx:
+                        _ = unserialize(b'{ "data": ')
+                    messages.add(str(ctx.exception))
+                    with self.assertRaisesRegex(TypeError, "cannot parse JSON"):
+                        _ = Count.unserialize(b'{ "data": ')
+        # The error reads the same regardless of the parser:
+        self.assertEqual(len(messages), 1)
+
+    def test_unserialize_bytes(self):
+        data = Vector([INT_1, STR_FOO]).serialize()
+        self.assertEqual(unserialize(data.encode()), unserialize(data))
+        self.assertEqual(Vector.unserialize(data.encode()), Vector.unserialize(data))
+
     def test_container_from_broker(self):
         s = Set.from_broker({"data": [{"@data-type": "string", "data": "s"}]})
         self.assertEqual(1, len(s))
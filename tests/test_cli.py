@@ -1,50 +1,121 @@
 """This verifies zeek-client invocations."""
 
+import glob
+import hashlib
 import io
+import json
+import logging
 import os
 import re
+import runpy
 import shutil
 import subprocess
+import sys
 import tempfile
 import unittest
-from contextlib import contextmanager
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
 
-import zeekclient as zc
-
-TESTS = os.path.dirname(os.path.realpath(__file__))
-ROOT = os.path.normpath(os.path.join(TESTS, ".."))
+from testutil import ROOT, cli_parser
 
+import zeekclient as zc
 
-# A context guard to switch the current working directory.
-# With 3.11 this can go and become contextlib.chdir():
-@contextmanager
-def setdir(path):
-    origin = os.getcwd()
-    try:
-        os.chdir(path)
-        yield
-    finally:
-        os.chdir(origin)
+# Results that several of the command tests below include in their responses.
+CONFIG_ID_RESULT = zc.types.Result(
+    "reqid-0001",
+    data=zc.brokertypes.String("reqid-config-id"),
+).to_brokertype()
+MANAGER_RESULT = zc.types.Result(
+    "reqid-0002",
+    instance="instance1",
+    node="manager",
+).to_brokertype()
+LOGGER_RESULT = zc.types.Result(
+    "reqid-0003",
+    instance="instance1",
+    node="logger",
+).to_brokertype()
+
+
+def results(*specs):
+    """Returns a Brokertype vector of Management::Result records.
+
+    Each spec is either a (reqid, kwargs) tuple for the Result constructor, or
+    an already converted Result Brokertype.
+    """
+    return zc.brokertypes.Vector(
+        [
+            spec
+            if isinstance(spec, zc.brokertypes.Type)
+            else zc.types.Result(spec[0], **spec[1]).to_brokertype()
+            for spec in specs
+        ],
+    )
 
 
 class TestCliInvocation(unittest.TestCase):
-    # This invokes the zeek-client toplevel script.
+    # This invokes the zeek-client toplevel script's main() in-process: the
+    # package is already imported, so there's no need for a fresh interpreter
+    # per command. TestBundledCliInvocation covers running the launcher.
+
+    @classmethod
+    def setUpClass(cls):
+        script = runpy.run_path(
+            os.path.join(ROOT, "zeek-client"), run_name="zeek_client"
+        )
+        cls.main = staticmethod(script["main"])
+
+    def run_inproc(self, argv):
+        """Runs the script's main() with the given arguments.
+
+        Returns a tuple of exit code, stdout, and stderr content.
+        """
+        # main() configures logging and updates the global configuration from
+        # the environment and its arguments, so undo both once it returns.
+        handlers, level = list(zc.LOG.handlers), zc.LOG.level
+        config_snapshot = {
+            section: dict(zc.CONFIG.items(section, raw=True))
+            for section in zc.CONFIG.sections()
+        }
+        buf_out, buf_err = io.StringIO(), io.StringIO()
+
+        try:
+            argv_patch = mock.patch.object(sys, "argv", ["zeek-client", *argv])
+            stdout_patch = mock.patch.object(zc.cli, "STDOUT", buf_out)
+            with (
+                argv_patch,
+                stdout_patch,
+                redirect_stdout(buf_out),
+                redirect_stderr(buf_err),
+            ):
+                res = self.main()
+        except SystemExit as err:
+            res = err.code
+        finally:
+            zc.LOG.handlers[:] = handlers
+            zc.LOG.setLevel(level)
+            zc.CONFIG.clear()
+            zc.CONFIG.read_dict(config_snapshot)
+
+        return res or 0, buf_out.getvalue(), buf_err.getvalue()
 
     def test_help(self):
-        cproc = subprocess.run(
-            ["zeek-client", "--help"],
-            check=True,
-            capture_output=True,
-        )
-        self.assertEqual(cproc.returncode, 0)
+        res, output, _ = self.run_inproc(["--help"])
+        self.assertEqual(res, 0)
+        self.assertIn("usage: zeek-client", output)
 
     def test_show_settings(self):
-        cproc = subprocess.run(
-            ["zeek-client", "show-settings"],
-            check=True,
-            capture_output=True,
+        res, output, _ = self.run_inproc(["show-settings"])
+        self.assertEqual(res, 0)
+        self.assertIn("[client]", output)
+
+    def test_settings_do_not_leak(self):
+        res, output, _ = self.run_inproc(
+            ["--set", "client.request_timeout_secs=99", "show-settings"],
         )
-        self.assertEqual(cproc.returncode, 0)
+        self.assertEqual(res, 0)
+        self.assertIn("request_timeout_secs = 99", output)
+        self.assertEqual(zc.CONFIG.getint("client", "request_timeout_secs"), 20)
 
 
 class TestBundledCliInvocation(unittest.TestCase):
@@ -53,41 +124,104 @@ class TestBundledCliInvocation(unittest.TestCase):
     # system-level testing, this may become a btest too, but for we stick to
     # Python. Most system-level testing happens in the zeek-testing-cluster
     # external testsuite.
+    def run_quietly(self, cmd, cwd):
+        # The build steps produce plenty of output we don't need unless they
+        # fail, so discard it. On failure, re-run the command capturing its
+        # output for the test failure message.
+        #
+        # These short-lived children inherit nothing they could misuse, so we
+        # skip closing all inherited file descriptors (close_fds=False). That
+        # can otherwise be slow in containers with a high descriptor limit.
+        cproc = subprocess.run(
+            cmd,
+            cwd=cwd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=False,
+            check=False,
+        )
+        if cproc.returncode != 0:
+            cproc = subprocess.run(
+                cmd,
+                cwd=cwd,
+                capture_output=True,
+                close_fds=False,
+                check=False,
+            )
+            self.fail(
+                f"{' '.join(cmd)} failed:\n"
+                f"==== STDOUT ====\n{cproc.stdout.decode('utf-8')}\n"
+                f"==== STDERR ====\n{cproc.stderr.decode('utf-8')}",
+            )
+
+    def install_key(self):
+        # A digest of everything that goes into the bundled install, to
+        # identify a reusable install tree.
+        digest = hashlib.sha1()
+        paths = [
+            os.path.join(ROOT, "CMakeLists.txt"),
+            os.path.join(ROOT, "zeek-client"),
+        ]
+        paths += sorted(glob.glob(os.path.join(ROOT, "zeekclient", "*.py")))
+        for path in paths:
+            with open(path, "rb") as hdl:
+                digest.update(hdl.read())
+        return digest.hexdigest()
+
+    def install_bundled(self, instdir):
+        # Configure the package via cmake with a Python module directory, as
+        # Zeek would do. Do this from within the install directory ...
+        self.run_quietly(
+            [
+                "cmake",
+                "-D",
+                f'PY_MOD_INSTALL_DIR={os.path.join(instdir, "python")}',
+                f"--install-prefix={instdir}",
+                ROOT,
+            ],
+            cwd=instdir,
+        )
+
+        # ... and install there too, into local bin/ and python/ dirs.
+        self.run_quietly(["make", "install"], cwd=instdir)
+
+    def check_bundled(self, instdir):
+        # We should now be able to run "./bin/zeek-client --help".
+        cproc = subprocess.run(
+            [os.path.join(instdir, "bin", "zeek-client"), "--help"],
+            capture_output=True,
+            close_fds=False,
+            check=False,
+        )
+        if cproc.returncode != 0:
+            print("==== STDOUT ====")
+            print(cproc.stdout.decode("utf-8"))
+            print("==== STDERR ====")
+            print(cproc.stderr.decode("utf-8"))
+            self.fail("zeek-client invocation failed")
+
     @unittest.skipUnless(
         shutil.which("cmake") and shutil.which("make"),
         "needs both cmake and make in the system path",
     )
     def test_bundled_install(self):
-        with tempfile.TemporaryDirectory() as tmpdir, setdir(tmpdir):
-            # Configure the package via cmake with a Python module directory, as
-            # Zeek would do. Do this from the temp directory we're now in ...
-            cproc = subprocess.run(
-                [
-                    "cmake",
-                    "-D",
-                    f'PY_MOD_INSTALL_DIR={os.path.join(tmpdir, "python")}',
-                    f"--install-prefix={tmpdir}",
-                    ROOT,
-                ],
-                check=True,
-                capture_output=True,
+        # For quicker local re-runs, ZEEK_CLIENT_TEST_CACHE=1 keeps the install
+        # tree in the temp directory and reuses it as long as its inputs remain
+        # unchanged.
+        if os.getenv("ZEEK_CLIENT_TEST_CACHE") == "1":
+            instdir = os.path.join(
+                tempfile.gettempdir(),
+                f"zeek-client-bundle-{self.install_key()}",
             )
+            if not os.path.exists(os.path.join(instdir, "bin", "zeek-client")):
+                os.makedirs(instdir, exist_ok=True)
+                self.install_bundled(instdir)
+            self.check_bundled(instdir)
+            return
 
-            # ... and install there too, into local bin/ and python/ dirs.
-            cproc = subprocess.run(["make", "install"], check=True, capture_output=True)
-
-            # We should now be able to run "./bin/zeek-client --help".
-            cproc = subprocess.run(
-                [os.path.join(tmpdir, "bin", "zeek-client"), "--help"],
-                capture_output=True,
-                check=False,
-            )
-            if cproc.returncode != 0:
-                print("==== STDOUT ====")
-                print(cproc.stdout.decode("utf-8"))
-                print("==== STDERR ====")
-                print(cproc.stderr.decode("utf-8"))
-                self.fail("zeek-client invocation failed")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.install_bundled(tmpdir)
+            self.check_bundled(tmpdir)
 
 
 class TestCliBasics(unittest.TestCase):
@@ -98,63 +232,122 @@ class TestCliBasics(unittest.TestCase):
         self.assertIsNotNone(res.controller_broker_id)
 
 
+class OutputSink:
+    """A minimal file-like object collecting the strings written to it.
+
+    Unlike a StringIO it keeps its content when closed, as cmd_get_config does
+    with its output handle.
+    """
+
+    def __init__(self):
+        self.parts = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        self.close()
+
+    def write(self, data):
+        self.parts.append(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def getvalue(self):
+        return "".join(self.parts)
+
+
 class TestCli(unittest.TestCase):
     # This tests the zeekclient.cli module. Most commands in that module create
     # a controller object, so we mock out its generation so we can enqueue the
     # various response events in its websocket.
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = cli_parser()
+
+        # Request IDs need to be predictable for the expected outputs. No test
+        # changes this, so patch it once for the whole class.
+        def mock_make_uuid(_prefix=""):
+            return "mocked-reqid-00000"
+
+        cls.orig_make_uuid = zc.utils.make_uuid
+        zc.controller.make_uuid = mock_make_uuid
+        zc.types.make_uuid = mock_make_uuid
+        zc.utils.make_uuid = mock_make_uuid
+
+        # Constructing a controller sets up its websocket, so we create one and
+        # reset it to a pristine state for each test.
+        cls.shared_controller = zc.controller.Controller()
+
+        # For capturing log writes done by zeekclient code. The buffer gets
+        # emptied for each test.
+        cls.shared_logbuf = io.StringIO()
+        cls.loghandler = logging.StreamHandler(stream=cls.shared_logbuf)
+        zc.logs.configure(verbosity=2, handler=cls.loghandler)
+
+    @classmethod
+    def tearDownClass(cls):
+        zc.LOG.removeHandler(cls.loghandler)
+
+        zc.controller.make_uuid = cls.orig_make_uuid
+        zc.types.make_uuid = cls.orig_make_uuid
+        zc.utils.make_uuid = cls.orig_make_uuid
+
     def setUp(self):
-        # For capturing log writes done by zeekclient code
-        self.logbuf = io.StringIO()
-        zc.logs.configure(verbosity=2, stream=self.logbuf)
+        self.orig_create_controller = zc.cli.create_controller
+        self.reset_fixtures()
+
+    def reset_fixtures(self):
+        # Puts the per-test state in place. Tests running several scenarios as
+        # subtests call this between them.
+        self.logbuf = self.shared_logbuf
+        self.logbuf.seek(0)
+        self.logbuf.truncate()
 
-        self.controller = zc.controller.Controller()
+        self.controller = self.shared_controller
+        self.controller.controller_broker_id = None
+        self.controller.wsock.mock_reset()
 
         def mock_create_controller():
             self.controller.connect()
             return self.controller
 
-        self.orig_create_controller = zc.cli.create_controller
         zc.cli.create_controller = mock_create_controller
 
-        def mock_make_uuid(_prefix=""):
-            return "mocked-reqid-00000"
-
-        self.orig_make_uuid = zc.utils.make_uuid
-        zc.controller.make_uuid = mock_make_uuid
-        zc.types.make_uuid = mock_make_uuid
-        zc.utils.make_uuid = mock_make_uuid
-
         # Capture regular writes made by the commands,
         # and let us adjust stdin:
-        zc.cli.STDOUT = io.StringIO()
+        zc.cli.STDOUT = OutputSink()
         zc.cli.STDIN = io.StringIO()
 
     def tearDown(self):
         zc.cli.create_controller = self.orig_create_controller
 
-        zc.controller.make_uuid = self.orig_make_uuid
-        zc.types.make_uuid = self.orig_make_uuid
-        zc.utils.make_uuid = self.orig_make_uuid
-
     def assertLogLines(self, *patterns):  # noqa: N802
-        buflines = self.logbuf.getvalue().split("\n")
-        todo = list(patterns)
-        for line in buflines:
-            if todo and re.search(todo[0], line) is not None:
-                todo.pop(0)
+        # Match the patterns in order, stopping as soon as all have been found.
+        todo = iter([re.compile(pattern) for pattern in patterns])
+        regex = next(todo, None)
+        for line in self.logbuf.getvalue().splitlines():
+            if regex is None:
+                break
+            if regex.search(line) is not None:
+                regex = next(todo, None)
         msg = None
-        if todo:
-            msg = f"log pattern '{todo[0]}' not found; have:\n{self.logbuf.getvalue().strip()}"
-        self.assertEqual(len(todo), 0, msg)
+        if regex is not None:
+            msg = f"log pattern '{regex.pattern}' not found; have:\n{self.logbuf.getvalue().strip()}"
+        self.assertIsNone(regex, msg)
 
     def enqueue_response_event(self, event):
         msg = zc.brokertypes.DataMessage("dummy/topic", event.to_brokertype())
-        self.controller.wsock.mock_recv_queue.append(msg.serialize())
+        self.controller.wsock.mock_recv_queue.append(msg)
 
     def mock_no_controller(self, inargs):
         # This fakes the scenario where connecting to the controller fails.
-        parser = zc.cli.create_parser()
-        args = parser.parse_args(inargs)
+        args = self.parser.parse_args(inargs)
 
         def mock_create_controller():
             self.controller.wsock.mock_connect_exc = OSError()
@@ -168,8 +361,7 @@ class TestCli(unittest.TestCase):
     def mock_no_response(self, inargs):
         # This fakes the scenario where an established connection to the
         # controller starts experiencing trouble.
-        parser = zc.cli.create_parser()
-        args = parser.parse_args(inargs)
+        args = self.parser.parse_args(inargs)
 
         def mock_create_controller():
             self.controller.connect()
@@ -181,11 +373,29 @@ class TestCli(unittest.TestCase):
         self.assertEqual(args.run_cmd(args), 1)
         self.assertLogLines("error: no response received")
 
-    def test_cmd_deploy_no_controller(self):
-        self.mock_no_controller(["deploy"])
+    # The commands that talk to the controller, for the connectivity problem
+    # scenarios above.
+    CONTROLLER_CMDS = (
+        ["deploy"],
+        ["get-config"],
+        ["get-id-value", "Foo:id"],
+        ["get-instances"],
+        ["get-nodes"],
+        ["restart"],
+        ["stage-config", "-"],
+    )
 
-    def test_cmd_deploy_no_response(self):
-        self.mock_no_response(["deploy"])
+    def test_cmds_no_controller(self):
+        for inargs in self.CONTROLLER_CMDS:
+            with self.subTest(cmd=inargs[0]):
+                self.reset_fixtures()
+                self.mock_no_controller(inargs)
+
+    def test_cmds_no_response(self):
+        for inargs in self.CONTROLLER_CMDS:
+            with self.subTest(cmd=inargs[0]):
+                self.reset_fixtures()
+                self.mock_no_response(inargs)
 
     def test_cmd_deploy(self):
         node_outputs = zc.types.NodeOutputs("problems on stdout", "problems on stderr")
@@ -193,85 +403,59 @@ class TestCli(unittest.TestCase):
         self.enqueue_response_event(
             zc.events.DeployResponse(
                 zc.brokertypes.String(zc.utils.make_uuid()),
-                zc.brokertypes.Vector(
-                    [
-                        zc.types.Result(
-                            "reqid-0001",
-                            data=zc.brokertypes.String("reqid-config-id"),
-                        ).to_brokertype(),
-                        zc.types.Result(
-                            "reqid-0002",
-                            instance="instance1",
-                            node="manager",
-                        ).to_brokertype(),
-                        zc.types.Result(
-                            "reqid-0003",
-                            instance="instance1",
-                            node="logger",
-                        ).to_brokertype(),
-                        zc.types.Result(
-                            "reqid-0004",
-                            success=False,
-                            instance="instance1",
-                            node="worker1",
-                            data=node_outputs.to_brokertype(),
-                        ).to_brokertype(),
-                        zc.types.Result(
-                            "reqid-0005",
-                            success=False,
-                            instance="instance1",
-                            error="uh-oh",
-                        ).to_brokertype(),
-                        zc.types.Result(
-                            "reqid-0006",
-                            instance="instance1",
-                        ).to_brokertype(),
-                        zc.types.Result("reqid-0007").to_brokertype(),
-                    ],
+                results(
+                    CONFIG_ID_RESULT,
+                    MANAGER_RESULT,
+                    LOGGER_RESULT,
+                    (
+                        "reqid-0004",
+                        {
+                            "success": False,
+                            "instance": "instance1",
+                            "node": "worker1",
+                            "data": node_outputs.to_brokertype(),
+                        },
+                    ),
+                    (
+                        "reqid-0005",
+                        {"success": False, "instance": "instance1", "error": "uh-oh"},
+                    ),
+                    ("reqid-0006", {"instance": "instance1"}),
+                    ("reqid-0007", {}),
                 ),
             ),
         )
 
-        parser = zc.cli.create_parser()
-        args = parser.parse_args(["deploy"])
+        args = self.parser.parse_args(["deploy"])
 
         self.assertEqual(args.run_cmd, zc.cli.cmd_deploy)
         self.assertEqual(args.run_cmd(args), 1)
         self.assertEqual(
-            zc.cli.STDOUT.getvalue(),
-            """{
-  "errors": [
-    "uh-oh"
-  ],
-  "results": {
-    "id": "reqid-config-id",
-    "nodes": {
-      "logger": {
-        "instance": "instance1",
-        "success": true
-      },
-      "manager": {
-        "instance": "instance1",
-        "success": true
-      },
-      "worker1": {
-        "instance": "instance1",
-        "stderr": "problems on stderr",
-        "stdout": "problems on stdout",
-        "success": false
-      }
-    }
-  }
-}
-""",
+            json.loads(zc.cli.STDOUT.getvalue()),
+            {
+                "errors": ["uh-oh"],
+                "results": {
+                    "id": "reqid-config-id",
+                    "nodes": {
+                        "logger": {
+                            "instance": "instance1",
+                            "success": True,
+                        },
+                        "manager": {
+                            "instance": "instance1",
+                            "success": True,
+                        },
+                        "worker1": {
+                            "instance": "instance1",
+                            "stderr": "problems on stderr",
+                            "stdout": "problems on stdout",
+                            "success": False,
+                        },
+                    },
+                },
+            },
         )
 
-    def test_cmd_get_config_no_controller(self):
-        self.mock_no_controller(["get-config"])
-
-    def test_cmd_get_config_no_response(self):
-        self.mock_no_response(["get-config"])
-
     def test_cmd_get_config_as_json(self):
         config = zc.types.Configuration()
         config.instances.append(zc.types.Instance("instance1"))
@@ -289,44 +473,35 @@ class TestCli(unittest.TestCase):
             ),
         )
 
-        parser = zc.cli.create_parser()
-        args = parser.parse_args(["get-config", "--as-json"])
-
-        # cmd_get_config closes the output handle as part of its regular
-        # processing. After a close, the contents of a StringIO object vanish,
-        # so we prevent this:
-        zc.cli.STDOUT.close = lambda: None
+        args = self.parser.parse_args(["get-config", "--as-json"])
 
         self.assertEqual(args.run_cmd, zc.cli.cmd_get_config)
         self.assertEqual(args.run_cmd(args), 0)
 
-        zc.cli.STDOUT.flush()
-
         self.assertEqual(
-            zc.cli.STDOUT.getvalue(),
-            """{
-  "id": "mocked-reqid-00000",
-  "instances": [
-    {
-      "name": "instance1"
-    }
-  ],
-  "nodes": [
-    {
-      "cpu_affinity": null,
-      "env": {},
-      "instance": "instance1",
-      "interface": null,
-      "metrics_port": null,
-      "name": "worker1",
-      "options": null,
-      "port": null,
-      "role": "WORKER",
-      "scripts": null
-    }
-  ]
-}
-""",
+            json.loads(zc.cli.STDOUT.getvalue()),
+            {
+                "id": "mocked-reqid-00000",
+                "instances": [
+                    {
+                        "name": "instance1",
+                    },
+                ],
+                "nodes": [
+                    {
+                        "cpu_affinity": None,
+                        "env": {},
+                        "instance": "instance1",
+                        "interface": None,
+                        "metrics_port": None,
+                        "name": "worker1",
+                        "options": None,
+                        "port": None,
+                        "role": "WORKER",
+                        "scripts": None,
+                    },
+                ],
+            },
         )
 
     def test_cmd_get_config_as_ini(self):
@@ -346,19 +521,11 @@ class TestCli(unittest.TestCase):
             ),
         )
 
-        parser = zc.cli.create_parser()
-        args = parser.parse_args(["get-config"])
-
-        # cmd_get_config closes the output handle as part of its regular
-        # processing. After a close, the contents of a StringIO object vanish,
-        # so we prevent this:
-        zc.cli.STDOUT.close = lambda: None
+        args = self.parser.parse_args(["get-config"])
 
         self.assertEqual(args.run_cmd, zc.cli.cmd_get_config)
         self.assertEqual(args.run_cmd(args), 0)
 
-        zc.cli.STDOUT.flush()
-
         self.assertEqual(
             zc.cli.STDOUT.getvalue(),
             """[instances]
@@ -383,8 +550,7 @@ role = WORKER
             ),
         )
 
-        parser = zc.cli.create_parser()
-        args = parser.parse_args(["get-config"])
+        args = self.parser.parse_args(["get-config"])
 
         self.assertEqual(args.run_cmd, zc.cli.cmd_get_config)
         self.assertEqual(args.run_cmd(args), 1)
@@ -397,82 +563,64 @@ role = WORKER
             ),
         )
 
-        parser = zc.cli.create_parser()
-        args = parser.parse_args(["get-config"])
+        args = self.parser.parse_args(["get-config"])
 
         self.assertEqual(args.run_cmd, zc.cli.cmd_get_config)
         self.assertEqual(args.run_cmd(args), 1)
 
-    def test_cmd_get_id_value_no_controller(self):
-        self.mock_no_controller(["get-id-value", "Foo:id"])
-
-    def test_cmd_get_id_value_no_response(self):
-        self.mock_no_response(["get-id-value", "Foo:id"])
-
     def test_cmd_get_id_value(self):
         self.enqueue_response_event(
             zc.events.GetIdValueResponse(
                 zc.brokertypes.String(zc.utils.make_uuid()),
-                zc.brokertypes.Vector(
-                    [
-                        zc.types.Result(
-                            "reqid-0001",
-                            data=zc.brokertypes.String('"a-value"'),
-                            node="worker1",
-                        ).to_brokertype(),
-                        zc.types.Result(
-                            "reqid-0002",
-                            data=zc.brokertypes.String('"b-value"'),
-                            node="worker2",
-                        ).to_brokertype(),
-                        zc.types.Result(
-                            "reqid-0003",
-                            success=False,
-                            error="that did not work",
-                            node="worker2",
-                        ).to_brokertype(),
-                        zc.types.Result(
-                            "reqid-0004",
-                            data=zc.brokertypes.Count(10),
-                            node="worker2",
-                        ).to_brokertype(),
-                    ],
+                results(
+                    (
+                        "reqid-0001",
+                        {"data": zc.brokertypes.String('"a-value"'), "node": "worker1"},
+                    ),
+                    (
+                        "reqid-0002",
+                        {"data": zc.brokertypes.String('"b-value"'), "node": "worker2"},
+                    ),
+                    (
+                        "reqid-0003",
+                        {
+                            "success": False,
+                            "error": "that did not work",
+                            "node": "worker2",
+                        },
+                    ),
+                    (
+                        "reqid-0004",
+                        {"data": zc.brokertypes.Count(10), "node": "worker2"},
+                    ),
                 ),
             ),
         )
 
-        parser = zc.cli.create_parser()
-        args = parser.parse_args(["get-id-value", "Foo:id"])
+        args = self.parser.parse_args(["get-id-value", "Foo:id"])
 
         self.assertEqual(args.run_cmd, zc.cli.cmd_get_id_value)
         self.assertEqual(args.run_cmd(args), 1)
         self.assertEqual(
-            zc.cli.STDOUT.getvalue(),
-            """{
-  "errors": [
-    {
-      "error": "that did not work",
-      "source": "worker2"
-    },
-    {
-      "error": "invalid result data type {\\"@data-type\\": \\"count\\", \\"data\\": 10}",
-      "source": "worker2"
-    }
-  ],
-  "results": {
-    "worker1": "a-value",
-    "worker2": "b-value"
-  }
-}
-""",
+            json.loads(zc.cli.STDOUT.getvalue()),
+            {
+                "errors": [
+                    {
+                        "error": "that did not work",
+                        "source": "worker2",
+                    },
+                    {
+                        "error": 'invalid result data type {"@data-type": "count", "data": 10}',
+                        "source": "worker2",
+                    },
+                ],
+                "results": {
+                    "worker1": "a-value",
+                    "worker2": "b-value",
+                },
+            },
         )
 
-    def test_cmd_get_instances_no_controller(self):
-        self.mock_no_controller(["get-instances"])
-
-    def test_cmd_get_instances_no_response(self):
-        self.mock_no_response(["get-instances"])
-
     def test_cmd_get_instances(self):
         self.enqueue_response_event(
             zc.events.GetInstancesResponse(
@@ -497,42 +645,34 @@ role = WORKER
             ),
         )
 
-        parser = zc.cli.create_parser()
-        args = parser.parse_args(["get-instances"])
+        args = self.parser.parse_args(["get-instances"])
 
         self.assertEqual(args.run_cmd, zc.cli.cmd_get_instances)
         self.assertEqual(args.run_cmd(args), 0)
         self.assertEqual(
-            zc.cli.STDOUT.getvalue(),
-            """{
-  "instance1": {
-    "host": "10.0.0.1",
-    "port": 123
-  },
-  "instance2": {
-    "host": "10.0.0.2",
-    "port": 234
-  }
-}
-""",
+            json.loads(zc.cli.STDOUT.getvalue()),
+            {
+                "instance1": {
+                    "host": "10.0.0.1",
+                    "port": 123,
+                },
+                "instance2": {
+                    "host": "10.0.0.2",
+                    "port": 234,
+                },
+            },
         )
 
-    def test_cmd_get_nodes_no_controller(self):
-        self.mock_no_controller(["get-nodes"])
-
-    def test_cmd_get_nodes_no_response(self):
-        self.mock_no_response(["get-nodes"])
-
     def test_cmd_get_nodes(self):
         self.enqueue_response_event(
             zc.events.GetNodesResponse(
                 zc.brokertypes.String(zc.utils.make_uuid()),
-                zc.brokertypes.Vector(
-                    [
-                        zc.types.Result(
-                            "reqid-0001",
-                            instance="instance1",
-                            data=zc.brokertypes.Vector(
+                results(
+                    (
+                        "reqid-0001",
+                        {
+                            "instance": "instance1",
+                            "data": zc.brokertypes.Vector(
                                 [
                                     zc.types.NodeStatus(
                                         "manager",
@@ -552,11 +692,13 @@ role = WORKER
                                     ).to_brokertype(),
                                 ],
                             ),
-                        ).to_brokertype(),
-                        zc.types.Result(
-                            "reqid-0002",
-                            instance="instance2",
-                            data=zc.brokertypes.Vector(
+                        },
+                    ),
+                    (
+                        "reqid-0002",
+                        {
+                            "instance": "instance2",
+                            "data": zc.brokertypes.Vector(
                                 [
                                     zc.types.NodeStatus(
                                         "worker1",
@@ -574,83 +716,70 @@ role = WORKER
                                     ).to_brokertype(),
                                 ],
                             ),
-                        ).to_brokertype(),
-                        # These cover various error conditions
-                        zc.types.Result(
-                            "reqid-0003",
-                            success=False,
-                            instance="instance3",
-                            error="uh-oh",
-                        ).to_brokertype(),
-                        zc.types.Result(
-                            "reqid-0003",
-                            instance="instance4",
-                        ).to_brokertype(),
-                    ],
+                        },
+                    ),
+                    # These cover various error conditions
+                    (
+                        "reqid-0003",
+                        {"success": False, "instance": "instance3", "error": "uh-oh"},
+                    ),
+                    ("reqid-0003", {"instance": "instance4"}),
                 ),
             ),
         )
 
-        parser = zc.cli.create_parser()
-        args = parser.parse_args(["get-nodes"])
+        args = self.parser.parse_args(["get-nodes"])
 
         self.assertEqual(args.run_cmd, zc.cli.cmd_get_nodes)
         self.assertEqual(args.run_cmd(args), 1)
         self.assertEqual(
-            zc.cli.STDOUT.getvalue(),
-            """{
-  "errors": [
-    {
-      "error": "uh-oh",
-      "source": "instance3"
-    },
-    {
-      "error": "result does not contain node status data",
-      "source": "instance4"
-    }
-  ],
-  "results": {
-    "instance1": {
-      "logger": {
-        "cluster_role": "LOGGER",
-        "mgmt_role": null,
-        "pid": 12346,
-        "port": 2201,
-        "state": "RUNNING"
-      },
-      "manager": {
-        "cluster_role": "MANAGER",
-        "mgmt_role": null,
-        "pid": 12345,
-        "port": 2200,
-        "state": "RUNNING"
-      }
-    },
-    "instance2": {
-      "worker1": {
-        "cluster_role": "WORKER",
-        "mgmt_role": null,
-        "pid": 23456,
-        "state": "RUNNING"
-      },
-      "worker2": {
-        "cluster_role": "WORKER",
-        "mgmt_role": null,
-        "pid": 23457,
-        "state": "RUNNING"
-      }
-    }
-  }
-}
-""",
+            json.loads(zc.cli.STDOUT.getvalue()),
+            {
+                "errors": [
+                    {
+                        "error": "uh-oh",
+                        "source": "instance3",
+                    },
+                    {
+                        "error": "result does not contain node status data",
+                        "source": "instance4",
+                    },
+                ],
+                "results": {
+                    "instance1": {
+                        "logger": {
+                            "cluster_role": "LOGGER",
+                            "mgmt_role": None,
+                            "pid": 12346,
+                            "port": 2201,
+                            "state": "RUNNING",
+                        },
+                        "manager": {
+                            "cluster_role": "MANAGER",
+                            "mgmt_role": None,
+                            "pid": 12345,
+                            "port": 2200,
+                            "state": "RUNNING",
+                        },
+                    },
+                    "instance2": {
+                        "worker1": {
+                            "cluster_role": "WORKER",
+                            "mgmt_role": None,
+                            "pid": 23456,
+                            "state": "RUNNING",
+                        },
+                        "worker2": {
+                            "cluster_role": "WORKER",
+                            "mgmt_role": None,
+                            "pid": 23457,
+                            "state": "RUNNING",
+                        },
+                    },
+                },
+            },
         )
 
-    def test_cmd_restart_no_controller(self):
-        self.mock_no_controller(["restart"])
-
-    def test_cmd_restart_no_response(self):
-        self.mock_no_response(["restart"])
-
     def test_cmd_restart(self):
         self.enqueue_response_event(
             zc.events.RestartResponse(
@@ -688,46 +817,35 @@ role = WORKER
             ),
         )
 
-        parser = zc.cli.create_parser()
-        args = parser.parse_args(["restart"])
+        args = self.parser.parse_args(["restart"])
 
         self.assertEqual(args.run_cmd, zc.cli.cmd_restart)
         self.assertEqual(args.run_cmd(args), 1)
         self.assertEqual(
-            zc.cli.STDOUT.getvalue(),
-            """{
-  "errors": [
-    {
-      "error": "unknown node",
-      "source": "worker3"
-    }
-  ],
-  "results": {
-    "logger": true,
-    "manager": true,
-    "worker1": true,
-    "worker2": true
-  }
-}
-""",
+            json.loads(zc.cli.STDOUT.getvalue()),
+            {
+                "errors": [
+                    {
+                        "error": "unknown node",
+                        "source": "worker3",
+                    },
+                ],
+                "results": {
+                    "logger": True,
+                    "manager": True,
+                    "worker1": True,
+                    "worker2": True,
+                },
+            },
         )
 
-    def test_cmd_stage_config_no_controller(self):
-        self.mock_no_controller(["stage-config", "-"])
-
-    def test_cmd_stage_config_no_response(self):
-        self.mock_no_response(["stage-config", "-"])
-
     def test_cmd_stage_config(self):
         self.enqueue_response_event(
             zc.events.StageConfigurationResponse(
                 zc.brokertypes.String(zc.utils.make_uuid()),
                 zc.brokertypes.Vector(
                     [
-                        zc.types.Result(
-                            "reqid-0001",
-                            data=zc.brokertypes.String("reqid-config-id"),
-                        ).to_brokertype(),
+                        CONFIG_ID_RESULT,
                         zc.types.Result(
                             "reqid-0002",
                             success=False,
@@ -738,22 +856,18 @@ role = WORKER
             ),
         )
 
-        parser = zc.cli.create_parser()
-        args = parser.parse_args(["stage-config", "-"])
+        args = self.parser.parse_args(["stage-config", "-"])
 
         self.assertEqual(args.run_cmd, zc.cli.cmd_stage_config)
         self.assertEqual(args.run_cmd(args), 1)
         self.assertEqual(
-            zc.cli.STDOUT.getvalue(),
-            """{
-  "errors": [
-    "uh-oh"
-  ],
-  "results": {
-    "id": "reqid-config-id"
-  }
-}
-""",
+            json.loads(zc.cli.STDOUT.getvalue()),
+            {
+                "errors": ["uh-oh"],
+                "results": {
+                    "id": "reqid-config-id",
+                },
+            },
         )
 
     def test_cmd_deploy_config(self):
@@ -762,10 +876,7 @@ role = WORKER
                 zc.brokertypes.String(zc.utils.make_uuid()),
                 zc.brokertypes.Vector(
                     [
-                        zc.types.Result(
-                            "reqid-0001",
-                            data=zc.brokertypes.String("reqid-config-id"),
-                        ).to_brokertype(),
+                        CONFIG_ID_RESULT,
                     ],
                 ),
             ),
@@ -776,54 +887,40 @@ role = WORKER
                 zc.brokertypes.String(zc.utils.make_uuid()),
                 zc.brokertypes.Vector(
                     [
-                        zc.types.Result(
-                            "reqid-0001",
-                            data=zc.brokertypes.String("reqid-config-id"),
-                        ).to_brokertype(),
-                        zc.types.Result(
-                            "reqid-0002",
-                            instance="instance1",
-                            node="manager",
-                        ).to_brokertype(),
-                        zc.types.Result(
-                            "reqid-0003",
-                            instance="instance1",
-                            node="logger",
-                        ).to_brokertype(),
+                        CONFIG_ID_RESULT,
+                        MANAGER_RESULT,
+                        LOGGER_RESULT,
                     ],
                 ),
             ),
         )
 
-        parser = zc.cli.create_parser()
-        args = parser.parse_args(["deploy-config", "-"])
+        args = self.parser.parse_args(["deploy-config", "-"])
 
         self.assertEqual(args.run_cmd, zc.cli.cmd_deploy_config)
         self.assertEqual(args.run_cmd(args), 0)
         self.assertEqual(
-            zc.cli.STDOUT.getvalue(),
-            """{
-  "errors": [],
-  "results": {
-    "id": "reqid-config-id",
-    "nodes": {
-      "logger": {
-        "instance": "instance1",
-        "success": true
-      },
-      "manager": {
-        "instance": "instance1",
-        "success": true
-      }
-    }
-  }
-}
-""",
+            json.loads(zc.cli.STDOUT.getvalue()),
+            {
+                "errors": [],
+                "results": {
+                    "id": "reqid-config-id",
+                    "nodes": {
+                        "logger": {
+                            "instance": "instance1",
+                            "success": True,
+                        },
+                        "manager": {
+                            "instance": "instance1",
+                            "success": True,
+                        },
+                    },
+                },
+            },
         )
 
     def test_show_settings(self):
-        parser = zc.cli.create_parser()
-        args = parser.parse_args(["show-settings"])
+        args = self.parser.parse_args(["show-settings"])
 
         self.assertEqual(args.run_cmd, zc.cli.cmd_show_settings)
         self.assertEqual(args.run_cmd(args), 0)
@@ -5,12 +5,26 @@ controller), and serialize them correctly to INI/JSON.
 
 import configparser
 import io
-import json
+import logging
 import unittest
 from unittest.mock import MagicMock, patch
 
 import zeekclient
 
+# Maps a UUID's hex digits to "x", keeping the dashes, for comparing UUIDs.
+UUID_CANON = str.maketrans(dict.fromkeys("0123456789abcdefABCDEF", "x"))
+
+# A buffer reused for rendering configurations to strings.
+RENDER_BUF = io.StringIO()
+
+
+def render(cfp):
+    """Returns the given config parser's content as a string."""
+    RENDER_BUF.seek(0)
+    RENDER_BUF.truncate()
+    cfp.write(RENDER_BUF)
+    return RENDER_BUF.getvalue()
+
 
 class TestRendering(unittest.TestCase):
     INI_INPUT = """# A sample ini using all available keys.
@@ -70,135 +84,139 @@ instance = agent
 role = WORKER
 interface = enp3s0
 cpu_affinity = 8
-metrics_port = 6001
-"""
-    JSON_EXPECTED = """{
-    "id": "xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx",
-    "instances": [
-        {
-            "name": "agent"
-        }
-    ],
-    "nodes": [
-        {
-            "cpu_affinity": null,
-            "env": {},
-            "instance": "agent",
-            "interface": null,
-            "metrics_port": null,
-            "name": "logger-01",
-            "options": null,
-            "port": 5001,
-            "role": "LOGGER",
-            "scripts": [
-                "foo/bar/baz"
-            ]
-        },
-        {
-            "cpu_affinity": null,
-            "env": {},
-            "instance": "agent",
-            "interface": null,
-            "metrics_port": 6000,
-            "name": "manager",
-            "options": null,
-            "port": 5000,
-            "role": "MANAGER",
-            "scripts": null
-        },
-        {
-            "cpu_affinity": 4,
-            "env": {
-                "BLUM": "frub",
-                "FOO": "BAR"
+metrics_port = 6001"""
+    JSON_EXPECTED = {
+        "id": "xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx",
+        "instances": [
+            {
+                "name": "agent",
+            },
+        ],
+        "nodes": [
+            {
+                "cpu_affinity": None,
+                "env": {},
+                "instance": "agent",
+                "interface": None,
+                "metrics_port": None,
+                "name": "logger-01",
+                "options": None,
+                "port": 5001,
+                "role": "LOGGER",
+                "scripts": ["foo/bar/baz"],
+            },
+            {
+                "cpu_affinity": None,
+                "env": {},
+                "instance": "agent",
+                "interface": None,
+                "metrics_port": 6000,
+                "name": "manager",
+                "options": None,
+                "port": 5000,
+                "role": "MANAGER",
+                "scripts": None,
+            },
+            {
+                "cpu_affinity": 4,
+                "env": {
+                    "BLUM": "frub",
+                    "FOO": "BAR",
+                },
+                "instance": "agent",
+                "interface": "lo",
+                "metrics_port": None,
+                "name": "worker-01",
+                "options": None,
+                "port": None,
+                "role": "WORKER",
+                "scripts": None,
             },
-            "instance": "agent",
-            "interface": "lo",
-            "metrics_port": null,
-            "name": "worker-01",
-            "options": null,
-            "port": null,
-            "role": "WORKER",
-            "scripts": null
-        },
-        {
-            "cpu_affinity": 8,
-            "env": {},
-            "instance": "agent",
-            "interface": "enp3s0",
-            "metrics_port": 6001,
-            "name": "worker-02",
-            "options": null,
-            "port": null,
-            "role": "WORKER",
-            "scripts": null
-        }
-    ]
-}"""
+            {
+                "cpu_affinity": 8,
+                "env": {},
+                "instance": "agent",
+                "interface": "enp3s0",
+                "metrics_port": 6001,
+                "name": "worker-02",
+                "options": None,
+                "port": None,
+                "role": "WORKER",
+                "scripts": None,
+            },
+        ],
+    }
 
     def assertEqualStripped(self, str1, str2):  # noqa: N802
-        self.assertEqual(str1.strip(), str2.strip())
+        # Only the first string gets stripped: the expected values in this file
+        # have no leading or trailing whitespace to begin with.
+        self.assertEqual(str1.strip(), str2)
 
-    def parser_from_string(self, content):
+    @staticmethod
+    def parser_from_string(content):
         cfp = configparser.ConfigParser(allow_no_value=True)
         cfp.read_string(content)
         return cfp
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
+        # The full configuration serves several tests that only render it, so
+        # parse it just once.
+        cls.full_config = zeekclient.types.Configuration.from_config_parser(
+            cls.parser_from_string(cls.INI_INPUT),
+        )
+
         # A buffer receiving any created log messages, for validation. We could
         # also assertLogs(), but with the latter it's more work to get exactly
-        # the output the user would see.
-        self.logbuf = io.StringIO()
-        zeekclient.logs.configure(verbosity=3, stream=self.logbuf)
+        # the output the user would see. Tests share the buffer, emptying it
+        # first.
+        cls.shared_logbuf = io.StringIO()
+        cls.loghandler = logging.StreamHandler(stream=cls.shared_logbuf)
+        zeekclient.logs.configure(verbosity=3, handler=cls.loghandler)
+
+    @classmethod
+    def tearDownClass(cls):
+        zeekclient.LOG.removeHandler(cls.loghandler)
+
+    def setUp(self):
+        self.logbuf = self.shared_logbuf
+        self.logbuf.seek(0)
+        self.logbuf.truncate()
 
     def test_full_config_ini(self):
         # This test parses a feature-complete configuration from an INI file,
         # and verifies that writing it back out to an INI yields expected
         # content.
 
-        # Parse the input into a config parser, and create a Configuration
-        # object from it.
-        cfp = self.parser_from_string(self.INI_INPUT)
-        config = zeekclient.types.Configuration.from_config_parser(cfp)
+        # setUpClass() parsed the input into a Configuration object.
+        config = self.full_config
         self.assertTrue(config is not None)
 
         # Turning that back into a config parser should have expected content:
-        cfp = config.to_config_parser()
-        with io.StringIO() as buf:
-            cfp.write(buf)
-            self.assertEqualStripped(buf.getvalue(), self.INI_EXPECTED)
+        output = render(config.to_config_parser())
+        self.assertEqualStripped(output, self.INI_EXPECTED)
 
-        # Another roundtrip: the content should not change.
+        # Another roundtrip, from the rendered text: the content should not
+        # change.
+        cfp = self.parser_from_string(output)
         config = zeekclient.types.Configuration.from_config_parser(cfp)
         self.assertTrue(config is not None)
-
-        cfp = config.to_config_parser()
-        with io.StringIO() as buf:
-            cfp.write(buf)
-            self.assertEqualStripped(buf.getvalue(), self.INI_EXPECTED)
+        self.assertEqualStripped(render(config.to_config_parser()), self.INI_EXPECTED)
 
     def test_full_config_json(self):
         # This test parses a feature-complete configuration from an INI file,
         # and verifies that writing it to JSON yields expected content.
 
-        # Parse the input into a config parser, and create a Configuration
-        # object from it.
-        cfp = self.parser_from_string(self.INI_INPUT)
-        config = zeekclient.types.Configuration.from_config_parser(cfp)
+        # setUpClass() parsed the input into a Configuration object.
+        config = self.full_config
         self.assertTrue(config is not None)
 
         jdata = config.to_json_data()
 
-        def canon(c):
-            """Canonicalize the ID"""
-            return "-" if c == "-" else "x"
+        # Canonicalize the ID
+        jdata["id"] = jdata["id"].translate(UUID_CANON)
 
-        jdata["id"] = "".join([canon(c) for c in jdata["id"]])
-
-        self.assertEqual(
-            json.dumps(jdata, sort_keys=True, indent=4),
-            self.JSON_EXPECTED,
-        )
+        self.assertEqual(jdata, self.JSON_EXPECTED)
 
     def test_config_addl_key(self):
         # This test creates a Configuration from an INI file with additional
@@ -222,16 +240,13 @@ agent
 [manager]
 instance = agent
 role = MANAGER
-port = 5000
-"""
+port = 5000"""
         cfp = self.parser_from_string(ini_input)
         config = zeekclient.types.Configuration.from_config_parser(cfp)
         self.assertTrue(config is not None)
 
         cfp = config.to_config_parser()
-        with io.StringIO() as buf:
-            cfp.write(buf)
-            self.assertEqualStripped(buf.getvalue(), ini_expected)
+        self.assertEqualStripped(render(cfp), ini_expected)
 
         self.assertEqualStripped(
             self.logbuf.getvalue(),
@@ -260,17 +275,14 @@ agent3 = ::2:2151
 [manager]
 instance = agent
 role = MANAGER
-port = 5000
-"""
+port = 5000"""
         cfp = self.parser_from_string(ini_input)
         config = zeekclient.types.Configuration.from_config_parser(cfp)
         self.assertTrue(config is not None)
 
         # Turning that back into a config parser should have expected content:
         cfp = config.to_config_parser()
-        with io.StringIO() as buf:
-            cfp.write(buf)
-            self.assertEqualStripped(buf.getvalue(), ini_expected)
+        self.assertEqualStripped(render(cfp), ini_expected)
 
     def test_config_invalid_ipv4_instance(self):
         # This test creates a Configuration with an invalid IPv4 address
@@ -444,22 +456,18 @@ role = manager
 [manager]
 role = manager
 """
-        ini_expected = """
-[instances]
+        ini_expected = """[instances]
 agent-testbox
 
 [manager]
 instance = agent-testbox
-role = MANAGER
-"""
+role = MANAGER"""
         cfp = self.parser_from_string(ini_input)
         config = zeekclient.types.Configuration.from_config_parser(cfp)
         self.assertTrue(config is not None)
 
         cfp = config.to_config_parser()
-        with io.StringIO() as buf:
-            cfp.write(buf)
-            self.assertEqualStripped(buf.getvalue(), ini_expected)
+        self.assertEqualStripped(render(cfp), ini_expected)
 
     def test_config_missing_instance_section(self):
         ini_input = """
@@ -475,8 +483,7 @@ role = logger
 instance = agent
 role = worker
 """
-        ini_expected = """
-[instances]
+        ini_expected = """[instances]
 agent
 agent2
 
@@ -490,13 +497,10 @@ role = MANAGER
 
 [worker]
 instance = agent
-role = WORKER
-"""
+role = WORKER"""
         cfp = self.parser_from_string(ini_input)
         config = zeekclient.types.Configuration.from_config_parser(cfp)
         self.assertTrue(config is not None)
 
         cfp = config.to_config_parser()
-        with io.StringIO() as buf:
-            cfp.write(buf)
-            self.assertEqualStripped(buf.getvalue(), ini_expected)
+        self.assertEqualStripped(render(cfp), ini_expected)
@@ -7,6 +7,8 @@ import os
 import tempfile
 import unittest
 
+from testutil import cli_parser
+
 import zeekclient
 
 
@@ -24,11 +26,14 @@ class TestConfig(unittest.TestCase):
         self.assertEqual(self.config.getboolean("client", "rich_logging_format"), False)
 
     def test_update_from_file(self):
-        with tempfile.NamedTemporaryFile("w", delete=False) as hdl:
+        # This needs an actual file, since reading one is what we're testing.
+        # Flushing suffices for the content to be readable by name, and the
+        # file gets removed once we leave the block.
+        with tempfile.NamedTemporaryFile("w") as hdl:
             hdl.write("[client]\nrequest_timeout_secs = 10\n")
-            hdl.close()
+            hdl.flush()
             self.config.update_from_file(hdl.name)
-            self.assertEqual(self.config.getint("client", "request_timeout_secs"), 10)
+        self.assertEqual(self.config.getint("client", "request_timeout_secs"), 10)
 
     @unittest.mock.patch.dict(
         os.environ,
@@ -42,8 +47,7 @@ class TestConfig(unittest.TestCase):
         self.assertEqual(self.config.get("server", "FOO"), "1 2 3")
 
     def test_update_from_args(self):
-        parser = zeekclient.cli.create_parser()
-        args = parser.parse_args(
+        args = cli_parser().parse_args(
             ["--set", "client.request_timeout_secs=42", "--set", "server.FOO=1 2 3"],
         )
         self.config.update_from_args(args)
@@ -51,64 +55,34 @@ class TestConfig(unittest.TestCase):
         self.assertEqual(self.config.get("server", "FOO"), "1 2 3")
 
     def test_update_from_args_controller_host(self):
-        parser = zeekclient.cli.create_parser()
-        args = parser.parse_args(["--controller", "foo"])
-        self.config.update_from_args(args)
-        self.assertEqual(self.config.get("controller", "host"), "foo")
-        self.assertEqual(self.config.getint("controller", "port"), 2149)
-
-        parser = zeekclient.cli.create_parser()
-        args = parser.parse_args(["--controller", "foo:"])
-        self.config.update_from_args(args)
-        self.assertEqual(self.config.get("controller", "host"), "foo")
-        self.assertEqual(self.config.getint("controller", "port"), 2149)
-
-        parser = zeekclient.cli.create_parser()
-        args = parser.parse_args(["--controller", "127.0.0.1"])
-        self.config.update_from_args(args)
-        self.assertEqual(self.config.get("controller", "host"), "127.0.0.1")
-        self.assertEqual(self.config.getint("controller", "port"), 2149)
-
-        parser = zeekclient.cli.create_parser()
-        args = parser.parse_args(["--controller", "127.0.0.1:"])
-        self.config.update_from_args(args)
-        self.assertEqual(self.config.get("controller", "host"), "127.0.0.1")
-        self.assertEqual(self.config.getint("controller", "port"), 2149)
-
-        parser = zeekclient.cli.create_parser()
-        args = parser.parse_args(["--controller", "[fe80::1]"])
-        self.config.update_from_args(args)
-        self.assertEqual(self.config.get("controller", "host"), "[fe80::1]")
-        self.assertEqual(self.config.getint("controller", "port"), 2149)
-
-        parser = zeekclient.cli.create_parser()
-        args = parser.parse_args(["--controller", "[fe80::1]:"])
-        self.config.update_from_args(args)
-        self.assertEqual(self.config.get("controller", "host"), "[fe80::1]")
-        self.assertEqual(self.config.getint("controller", "port"), 2149)
+        for arg, host in (
+            ("foo", "foo"),
+            ("foo:", "foo"),
+            ("127.0.0.1", "127.0.0.1"),
+            ("127.0.0.1:", "127.0.0.1"),
+            ("[fe80::1]", "[fe80::1]"),
+            ("[fe80::1]:", "[fe80::1]"),
+        ):
+            with self.subTest(controller=arg):
+                args = cli_parser().parse_args(["--controller", arg])
+                self.config.update_from_args(args)
+                self.assertEqual(self.config.get("controller", "host"), host)
+                self.assertEqual(self.config.getint("controller", "port"), 2149)
 
     def test_update_from_args_controller_port(self):
-        parser = zeekclient.cli.create_parser()
-        args = parser.parse_args(["--controller", ":2222"])
+        args = cli_parser().parse_args(["--controller", ":2222"])
         self.config.update_from_args(args)
         self.assertEqual(self.config.get("controller", "host"), "127.0.0.1")
         self.assertEqual(self.config.getint("controller", "port"), 2222)
 
     def test_update_from_args_controller_hostport(self):
-        parser = zeekclient.cli.create_parser()
-        args = parser.parse_args(["--controller", "foo:2222"])
-        self.config.update_from_args(args)
-        self.assertEqual(self.config.get("controller", "host"), "foo")
-        self.assertEqual(self.config.getint("controller", "port"), 2222)
-
-        parser = zeekclient.cli.create_parser()
-        args = parser.parse_args(["--controller", "127.0.0.1:2222"])
-        self.config.update_from_args(args)
-        self.assertEqual(self.config.get("controller", "host"), "127.0.0.1")
-        self.assertEqual(self.config.getint("controller", "port"), 2222)
-
-        parser = zeekclient.cli.create_parser()
-        args = parser.parse_args(["--controller", "[fe80::1]:2222"])
-        self.config.update_from_args(args)
-        self.assertEqual(self.config.get("controller", "host"), "[fe80::1]")
-        self.assertEqual(self.config.getint("controller", "port"), 2222)
+        for arg, host in (
+            ("foo:2222", "foo"),
+            ("127.0.0.1:2222", "127.0.0.1"),
+            ("[fe80::1]:2222", "[fe80::1]"),
+        ):
+            with self.subTest(controller=arg):
+                args = cli_parser().parse_args(["--controller", arg])
+                self.config.update_from_args(args)
+                self.assertEqual(self.config.get("controller", "host"), host)
+                self.assertEqual(self.config.getint("controller", "port"), 2222)
@@ -1,36 +1,117 @@
 """This verifies zeekclient.controller.Controller's behavior."""
 
-import io
+import collections
+import itertools
+import logging
 import os
 import re
 import ssl
 import unittest
 
 import websocket
+from testutil import TESTS
 
 import zeekclient
 
-TESTS = os.path.dirname(os.path.realpath(__file__))
+# Serialized payloads that aren't valid Broker messages, for error handling.
+COUNT_PAYLOAD = zeekclient.brokertypes.Count(1).serialize()
+VECTOR_PAYLOAD = zeekclient.brokertypes.DataMessage(
+    "dummy/topic",
+    zeekclient.brokertypes.Vector(),
+).serialize()
+
+
+# Request IDs only need to be distinct strings here, so count them up
+# instead of generating real UUIDs.
+REQIDS = (f"mocked-reqid-{num:05d}" for num in itertools.count())
+
+
+def wrap(event):
+    """Returns the serialized DataMessage carrying the given event."""
+    return zeekclient.brokertypes.DataMessage(
+        "dummy/topic",
+        event.to_brokertype(),
+    ).serialize()
+
+
+class ListHandler(logging.Handler):
+    """A log handler that keeps formatted log lines in a list."""
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
 
 
 class TestController(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # A handler collecting any created log messages, for validation. We
+        # could also assertLogs(), but with the latter it's more work to get
+        # exactly the output the user would see. Each test starts out with an
+        # empty handler, see setUp().
+        cls.loghandler = ListHandler()
+        zeekclient.logs.configure(verbosity=2, handler=cls.loghandler)
+
+        # Tests that only exchange messages over an established peering share
+        # a single connected controller, see reset_controller(). This way only
+        # the connect_* and handshake_* tests conduct the handshake.
+        cls.controller = zeekclient.controller.Controller()
+        assert cls.controller.connect()
+
+    @classmethod
+    def tearDownClass(cls):
+        zeekclient.logs.LOG.removeHandler(cls.loghandler)
+
     def setUp(self):
-        # A buffer receiving any created log messages, for validation. We could
-        # also assertLogs(), but with the latter it's more work to get exactly
-        # the output the user would see.
-        self.logbuf = io.StringIO()
-        zeekclient.logs.configure(verbosity=2, stream=self.logbuf)
+        self.loghandler.lines.clear()
+
+        # Many tests tweak the global configuration, so snapshot it here and
+        # restore it in tearDown() to keep those changes from leaking into
+        # subsequent tests.
+        self.config_snapshot = {
+            section: dict(zeekclient.CONFIG.items(section, raw=True))
+            for section in zeekclient.CONFIG.sections()
+        }
+
+        # Retries happen only in failure scenarios, and nothing in these tests
+        # depends on actually waiting between them. Two attempts are the
+        # minimum for successful peering (one each for connection and
+        # handshake), and suffice to exercise retries in the failure tests.
+        zeekclient.CONFIG.set("client", "peering_attempts", "2")
+        zeekclient.CONFIG.set("client", "peering_retry_delay_secs", "0")
+
+    def tearDown(self):
+        zeekclient.CONFIG.clear()
+        zeekclient.CONFIG.read_dict(self.config_snapshot)
+
+    def reset_controller(self):
+        """Returns the shared controller with empty socket mock queues.
+
+        The peering established in setUpClass() remains in place.
+        """
+        wsock = self.controller.wsock
+        wsock.mock_send_queue.clear()
+        wsock.mock_recv_queue.clear()
+        wsock.mock_recv_exc = None
+        return self.controller
 
     def assertLogLines(self, *patterns):  # noqa: N802
-        buflines = self.logbuf.getvalue().split("\n")
-        todo = list(patterns)
-        for line in buflines:
-            if todo and re.search(todo[0], line) is not None:
-                todo.pop(0)
+        # Match the patterns in order, stopping as soon as all have been found.
+        todo = iter([re.compile(pattern) for pattern in patterns])
+        regex = next(todo, None)
+        for line in self.loghandler.lines:
+            if regex is None:
+                break
+            if regex.search(line) is not None:
+                regex = next(todo, None)
         msg = None
-        if todo:
-            msg = f"log pattern '{todo[0]}' not found; have:\n{self.logbuf.getvalue().strip()}"
-        self.assertEqual(len(todo), 0, msg)
+        if regex is not None:
+            have = "\n".join(self.loghandler.lines)
+            msg = f"log pattern '{regex.pattern}' not found; have:\n{have}"
+        self.assertIsNone(regex, msg)
 
     def test_connect_successful(self):
         controller = zeekclient.controller.Controller()
@@ -125,70 +206,44 @@ class TestController(unittest.TestCase):
             with self.assertRaises(zeekclient.controller.ConfigError):
                 _ = zeekclient.controller.Controller()
 
-    def test_connect_fails_with_refused(self):
-        controller = zeekclient.controller.Controller()
-        controller.wsock.mock_connect_exc = ConnectionRefusedError()
-        # Dial down attempts and waits to make this fast:
-        zeekclient.CONFIG.set("client", "peering_attempts", "2")
-        zeekclient.CONFIG.set("client", "peering_retry_delay_secs", "0.1")
-        self.assertFalse(controller.connect())
-        self.assertLogLines(
-            "info: connecting to controller 127.0.0.1:2149",
-            r"error: websocket connection to 127.0.0.1:2149 timed out in connect\(\)",
-        )
-
-    def test_connect_fails_with_timeout(self):
-        controller = zeekclient.controller.Controller()
-        controller.wsock.mock_connect_exc = websocket.WebSocketTimeoutException(
-            "connection timed out",
-        )
-        # Dial down attempts and waits to make this fast:
-        zeekclient.CONFIG.set("client", "peering_attempts", "2")
-        zeekclient.CONFIG.set("client", "peering_retry_delay_secs", "0.1")
-        self.assertFalse(controller.connect())
-        self.assertLogLines(
-            "info: connecting to controller 127.0.0.1:2149",
-            r"error: websocket connection to 127.0.0.1:2149 timed out in connect\(\)",
-        )
-
-    def test_connect_fails_with_websocket_error(self):
-        controller = zeekclient.controller.Controller()
-        controller.wsock.mock_connect_exc = websocket.WebSocketException("uh-oh")
-        self.assertFalse(controller.connect())
-        self.assertLogLines(
-            "info: connecting to controller 127.0.0.1:2149",
-            r"error: websocket error in connect\(\) with controller 127.0.0.1:2149: uh-oh",
-        )
-
-    def test_connect_fails_with_sslerror(self):
-        controller = zeekclient.controller.Controller()
-        controller.wsock.mock_connect_exc = ssl.SSLError(
-            "dummy library version",
-            "uh-oh",
-        )
-        self.assertFalse(controller.connect())
-        self.assertLogLines(
-            "info: connecting to controller 127.0.0.1:2149",
-            r"error: socket TLS error in connect\(\) with controller 127.0.0.1:2149: uh-oh",
-        )
-
-    def test_connect_fails_with_oserror(self):
-        controller = zeekclient.controller.Controller()
-        controller.wsock.mock_connect_exc = OSError("uh-oh")
-        self.assertFalse(controller.connect())
-        self.assertLogLines(
-            "info: connecting to controller 127.0.0.1:2149",
-            r"error: socket error in connect\(\) with controller 127.0.0.1:2149: uh-oh",
-        )
-
-    def test_connect_fails_with_unknown_error(self):
-        controller = zeekclient.controller.Controller()
-        controller.wsock.mock_connect_exc = websocket.UnknownError("surprise")
-        self.assertFalse(controller.connect())
-        self.assertLogLines(
-            "info: connecting to controller 127.0.0.1:2149",
-            r"error: unexpected error in connect\(\) with controller 127.0.0.1:2149: surprise",
-        )
+    def test_connect_fails(self):
+        # Refused and timed-out connections get retried, all others fail
+        # immediately.
+        for exc, pattern in (
+            (
+                ConnectionRefusedError(),
+                r"error: websocket connection to 127.0.0.1:2149 timed out in connect\(\)",
+            ),
+            (
+                websocket.WebSocketTimeoutException("connection timed out"),
+                r"error: websocket connection to 127.0.0.1:2149 timed out in connect\(\)",
+            ),
+            (
+                websocket.WebSocketException("uh-oh"),
+                r"error: websocket error in connect\(\) with controller 127.0.0.1:2149: uh-oh",
+            ),
+            (
+                ssl.SSLError("dummy library version", "uh-oh"),
+                r"error: socket TLS error in connect\(\) with controller 127.0.0.1:2149: uh-oh",
+            ),
+            (
+                OSError("uh-oh"),
+                r"error: socket error in connect\(\) with controller 127.0.0.1:2149: uh-oh",
+            ),
+            (
+                websocket.UnknownError("surprise"),
+                r"error: unexpected error in connect\(\) with controller 127.0.0.1:2149: surprise",
+            ),
+        ):
+            with self.subTest(exc=type(exc).__name__):
+                self.loghandler.lines.clear()
+                controller = zeekclient.controller.Controller()
+                controller.wsock.mock_connect_exc = exc
+                self.assertFalse(controller.connect())
+                self.assertLogLines(
+                    "info: connecting to controller 127.0.0.1:2149",
+                    pattern,
+                )
 
     def test_handshake_fails_with_timeout(self):
         controller = zeekclient.controller.Controller()
@@ -217,44 +272,38 @@ class TestController(unittest.TestCase):
     def test_handshake_fails_with_protocol_data_error(self):
         controller = zeekclient.controller.Controller()
         # Not a Handshake ACK message:
-        controller.wsock.mock_recv_queue = [zeekclient.brokertypes.Count(1).serialize()]
+        controller.wsock.mock_recv_queue = collections.deque(
+            [COUNT_PAYLOAD],
+        )
         self.assertFalse(controller.connect())
         self.assertLogLines("error: protocol data error")
 
     def test_publish(self):
-        controller = zeekclient.controller.Controller()
-        self.assertTrue(controller.connect())
+        controller = self.reset_controller()
 
-        reqid = zeekclient.utils.make_uuid()
+        reqid = next(REQIDS)
         event = zeekclient.events.GetConfigurationRequest(reqid, True)
 
         controller.publish(event)
 
         # The event gets transmitted via the controller object's websocket, so
         # verify it's as expected: a DataMessage containing our event. This is
-        # the first message after the initial handshake, so the second in the
-        # queue.
+        # the only message sent since resetting the mock.
         message = zeekclient.brokertypes.DataMessage.unserialize(
-            controller.wsock.mock_send_queue[1],
+            controller.wsock.mock_send_queue[0],
         )
         self.assertEqual(event.to_brokertype().serialize(), message.data.serialize())
 
     def test_receive(self):
-        controller = zeekclient.controller.Controller()
-        self.assertTrue(controller.connect())
+        controller = self.reset_controller()
 
         event = zeekclient.events.GetConfigurationResponse(
-            zeekclient.utils.make_uuid(),
+            next(REQIDS),
             (),
         )
 
         # Mock an event in the receive queue, so we can receive something:
-        controller.wsock.mock_recv_queue.append(
-            zeekclient.brokertypes.DataMessage(
-                "dummy/topic",
-                event.to_brokertype(),
-            ).serialize(),
-        )
+        controller.wsock.mock_recv_queue.append(wrap(event))
 
         event, error = controller.receive()
 
@@ -262,12 +311,9 @@ class TestController(unittest.TestCase):
         self.assertEqual(error, "")
 
     def test_receive_fails_with_protocol_data_error(self):
-        controller = zeekclient.controller.Controller()
-        self.assertTrue(controller.connect())
+        controller = self.reset_controller()
         # Not a DataMessage:
-        controller.wsock.mock_recv_queue.append(
-            zeekclient.brokertypes.Count(1).serialize(),
-        )
+        controller.wsock.mock_recv_queue.append(COUNT_PAYLOAD)
         res, msg = controller.receive()
         self.assertIsNone(res)
         self.assertRegex(
@@ -276,8 +322,7 @@ class TestController(unittest.TestCase):
         )
 
     def test_receive_fails_with_timeout(self):
-        controller = zeekclient.controller.Controller()
-        self.assertTrue(controller.connect())
+        controller = self.reset_controller()
         controller.wsock.mock_recv_exc = websocket.WebSocketTimeoutException(
             "connection timed out",
         )
@@ -286,41 +331,28 @@ class TestController(unittest.TestCase):
         self.assertRegex(msg, "websocket connection .+ timed out")
 
     def test_receive_fails_with_unknown_error(self):
-        controller = zeekclient.controller.Controller()
-        self.assertTrue(controller.connect())
+        controller = self.reset_controller()
         controller.wsock.mock_recv_exc = websocket.UnknownError("surprise")
         res, msg = controller.receive()
         self.assertIsNone(res)
         self.assertRegex(msg, "unexpected error .+: surprise")
 
     def test_receive_fails_with_event_error(self):
-        controller = zeekclient.controller.Controller()
-        self.assertTrue(controller.connect())
+        controller = self.reset_controller()
         # A DataMessage, but not with an event:
-        controller.wsock.mock_recv_queue.append(
-            zeekclient.brokertypes.DataMessage(
-                "dummy/topic",
-                zeekclient.brokertypes.Vector(),
-            ).serialize(),
-        )
+        controller.wsock.mock_recv_queue.append(VECTOR_PAYLOAD)
         res, msg = controller.receive()
         self.assertIsNone(res)
         self.assertRegex(msg, "protocol data error .+: invalid event data")
 
     def test_transact(self):
-        controller = zeekclient.controller.Controller()
-        self.assertTrue(controller.connect())
+        controller = self.reset_controller()
 
-        reqid = zeekclient.utils.make_uuid()
+        reqid = next(REQIDS)
         event = zeekclient.events.DeployResponse(reqid, ())
 
         # Mock an event in the receive queue, so we can receive something:
-        controller.wsock.mock_recv_queue.append(
-            zeekclient.brokertypes.DataMessage(
-                "dummy/topic",
-                event.to_brokertype(),
-            ).serialize(),
-        )
+        controller.wsock.mock_recv_queue.append(wrap(event))
 
         event, error = controller.transact(
             zeekclient.events.DeployRequest,
@@ -333,10 +365,9 @@ class TestController(unittest.TestCase):
         self.assertEqual(event.reqid.to_py(), reqid)
 
     def test_transact_data_mismatches(self):
-        controller = zeekclient.controller.Controller()
-        self.assertTrue(controller.connect())
+        controller = self.reset_controller()
 
-        reqid = zeekclient.utils.make_uuid()
+        reqid = next(REQIDS)
 
         # Fill the receive queue with events. The first response mismatches in
         # its name, the second in its first argument (not reqid), the third
@@ -348,12 +379,7 @@ class TestController(unittest.TestCase):
         ]
 
         for evt in events:
-            controller.wsock.mock_recv_queue.append(
-                zeekclient.brokertypes.DataMessage(
-                    "dummy/topic",
-                    evt.to_brokertype(),
-                ).serialize(),
-            )
+            controller.wsock.mock_recv_queue.append(wrap(evt))
 
         event, error = controller.transact(
             zeekclient.events.DeployRequest,
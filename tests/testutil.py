@@ -0,0 +1,26 @@
+"""Helpers shared by the test modules.
+
+Test modules import these from here rather than from conftest.py: pytest
+loads the latter on its own, and importing it as a regular module may execute
+it a second time, depending on pytest's import mode.
+"""
+
+import functools
+import pathlib
+
+# The tests directory and the source tree's toplevel.
+TESTS = str(pathlib.Path(__file__).resolve().parent)
+ROOT = str(pathlib.Path(TESTS).parent)
+
+
+@functools.lru_cache(maxsize=1)
+def cli_parser():
+    """Returns a zeek-client argument parser shared by all tests.
+
+    Building the parser is comparatively costly, and parse_args() leaves it
+    unchanged. zeekclient.cli itself doesn't cache it since the parser's help
+    texts reflect the configuration at the time of creation.
+    """
+    import zeekclient.cli
+
+    return zeekclient.cli.create_parser()
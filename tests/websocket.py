@@ -3,9 +3,18 @@
 For details, see https://github.com/websocket-client/websocket-client.
 """
 
+import collections
+import functools
+
 import zeekclient
 
 
+@functools.lru_cache
+def handshake_ack(broker_id):
+    """Returns the serialized HandshakeAckMessage for the given Broker ID."""
+    return zeekclient.brokertypes.HandshakeAckMessage(broker_id, 1.0).serialize()
+
+
 # This typename needs to match the one in websocket-client or tests will fail.
 class WebSocketException(Exception):  # noqa: N818
     pass
@@ -22,8 +31,15 @@ class UnknownError(Exception):
 
 class WebSocket:
     def __init__(self, *_args, **_kwargs):
+        self.mock_reset()
+
+    def mock_reset(self):
+        """Returns the mock to its freshly constructed state."""
         self.timeout = None
 
+        # The Broker ID the mock server reports in its handshake response.
+        self.mock_broker_id = "broker-id-aaa"
+
         # The URL provided to connect(). Doesn't look like there's a quick way
         # to retrieve that from real instances.
         self.mock_url = None
@@ -34,16 +50,9 @@ class WebSocket:
         self.mock_connect_exc = None
         self.mock_recv_exc = None
 
-        self.mock_broker_id = "broker-id-aaa"
-
         # During normal operation the server responds with a
         # HandshakeAckMessage, so put that in the queue:
-        self.mock_recv_queue = [
-            zeekclient.brokertypes.HandshakeAckMessage(
-                self.mock_broker_id,
-                1.0,
-            ).serialize(),
-        ]
+        self.mock_recv_queue = collections.deque([handshake_ack(self.mock_broker_id)])
 
         # Messages sent via the socket
         self.mock_send_queue = []
@@ -62,7 +71,14 @@ class WebSocket:
             raise self.mock_recv_exc
 
         assert self.mock_recv_queue, "socket mock ran out of data"
-        return self.mock_recv_queue.pop(0)
+        msg = self.mock_recv_queue.popleft()
+
+        # Tests may enqueue Brokertype objects directly, deferring their
+        # serialization until the client actually reads them.
+        if isinstance(msg, zeekclient.brokertypes.Type):
+            return msg.serialize()
+
+        return msg
 
     def gettimeout(self):
         return self.timeout
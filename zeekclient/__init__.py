@@ -5,17 +5,12 @@ defined in Zeek's policy/management/frameworks/management/types.zeek, needed
 for request/response events.
 """
 
+import importlib
+
 from . import (
-    brokertypes,
-    cli,
     config,
     consts,
-    controller,
-    events,
     logs,
-    ssl,
-    types,
-    utils,
 )
 from .config import CONFIG
 from .consts import (
@@ -24,6 +19,33 @@ from .consts import (
 )
 from .logs import LOG
 
+# Submodules loaded upon first access, so that importing the package doesn't
+# pull in all of them (and their dependencies, like websocket-client) up front.
+_LAZY_SUBMODULES = frozenset(
+    (
+        "brokertypes",
+        "cli",
+        "controller",
+        "events",
+        "ssl",
+        "types",
+        "utils",
+    ),
+)
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        # The import also sets the submodule as a package attribute, so this
+        # function won't get called again for it.
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _LAZY_SUBMODULES)
+
+
 __version__ = "1.4.0"
 __all__ = [
     "brokertypes",
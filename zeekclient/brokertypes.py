@@ -12,10 +12,52 @@ For reference, see: https://docs.zeek.org/projects/broker/en/current/web-socket.
 import abc
 import datetime
 import enum
+import functools
 import ipaddress
 import json
 import re
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _orjson_loads(data):
+    """Parses JSON via orjson, which is considerably faster than json.loads().
+
+    orjson rejects some input the standard library accepts, including the NaN
+    and Infinity values that serialize() can produce, and words its errors
+    differently. So whatever orjson fails on gets reparsed by json.loads(),
+    which then produces the result or the error.
+    """
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return json.loads(data)
+
+
+_json_loads = json.loads if orjson is None else _orjson_loads
+
+
+@functools.cache
+def _member_names(cls):
+    """Returns the names of the members Type.__eq__() compares for a class.
+
+    These are the __slots__ of the class and all of its base classes. A class
+    in the hierarchy without __slots__ gives its instances a __dict__, which
+    then gets compared as well.
+    """
+    names = []
+    for klass in reversed(cls.__mro__):
+        if klass is object:
+            continue
+        if "__slots__" in klass.__dict__:
+            names.extend(klass.__dict__["__slots__"])
+        elif "__dict__" not in names:
+            names.append("__dict__")
+    return tuple(names)
+
 
 class Type(abc.ABC):
     """Base class for types we can instantiate from or render to Broker's JSON
@@ -23,6 +65,10 @@ class Type(abc.ABC):
     https://docs.zeek.org/projects/broker/en/current/web-socket.html
     """
 
+    # The types declare their members via __slots__. This keeps the many small
+    # objects making up Broker data compact, and drives equality comparison.
+    __slots__ = ()
+
     def serialize(self, pretty=False):
         """Serializes the object to Broker-compatible wire data.
 
@@ -36,16 +82,17 @@ class Type(abc.ABC):
     def __eq__(self, other):
         """The default equality method for brokertypes.
 
-        This implements member-by-member comparison based on the object's
-        __dict__. The types complement this by each implementing their own
-        __hash__() method.
+        This implements member-by-member comparison based on the members listed
+        in the __slots__ of the object's class and its base classes. The types
+        complement this by each implementing their own __hash__() method.
         """
         if self.__class__ != other.__class__:
             return NotImplemented
-        if len(self.__dict__) != len(other.__dict__):
-            return False
 
-        return self.__dict__ == other.__dict__
+        return all(
+            getattr(self, name) == getattr(other, name)
+            for name in _member_names(self.__class__)
+        )
 
     def __repr__(self):
         return self.serialize()
@@ -61,7 +108,8 @@ class Type(abc.ABC):
         a Python data structure. It then calls from_broker() to instantiate an
         object of this class from it.
 
-        data: raw wire WebSocket message content
+        data: raw wire WebSocket message content, as str or UTF-8 bytes. Pass
+            bytes as received, there's no need to decode them first.
 
         Returns: the resulting brokertype object.
 
@@ -69,7 +117,7 @@ class Type(abc.ABC):
         provides details.
         """
         try:
-            obj = json.loads(data)
+            obj = _json_loads(data)
         except json.JSONDecodeError as err:
             raise TypeError(
                 f"cannot parse JSON data for {cls.__name__}: {err.msg} -- {data}",
@@ -138,7 +186,14 @@ class Type(abc.ABC):
 class DataType(Type):
     """Base class for data types known to Broker."""
 
+    __slots__ = ()
+
     def __lt__(self, other):
+        # Comparisons mostly happen among values of the same type, for example
+        # when sorting set members or table keys, so check that case first.
+        # Subclasses then compare the values themselves.
+        if type(self) is type(other):
+            return NotImplemented
         if not isinstance(other, DataType):
             raise TypeError(
                 f"'<' comparison not supported between instances "
@@ -146,10 +201,7 @@ class DataType(Type):
             )
         # Supporting comparison accross data types allows us to sort the members
         # of a set or table keys. We simply compare the type names:
-        if self.__class__ != other.__class__:
-            return type(self).__name__ < type(other).__name__
-
-        return NotImplemented
+        return type(self).__name__ < type(other).__name__
 
     @classmethod
     def check_broker_data(cls, data):
@@ -164,6 +216,8 @@ class DataType(Type):
 class NoneType(DataType):
     """Broker's representation of an absent value."""
 
+    __slots__ = ()
+
     def __init__(self, _=None):
         # It helps to have a constructor that can be passed None explicitly, for
         # symmetry with other constructors below.
@@ -171,7 +225,7 @@ class NoneType(DataType):
 
     def __lt__(self, other):
         res = super().__lt__(other)
-        if res != NotImplemented:
+        if res is not NotImplemented:
             return res
         return False
 
@@ -193,12 +247,14 @@ class NoneType(DataType):
 
 
 class Boolean(DataType):
+    __slots__ = ("_value",)
+
     def __init__(self, value):
         self._value = bool(value)
 
     def __lt__(self, other):
         res = super().__lt__(other)
-        if res != NotImplemented:
+        if res is not NotImplemented:
             return res
         return self._value < other._value
 
@@ -220,6 +276,8 @@ class Boolean(DataType):
 
 
 class Count(DataType):
+    __slots__ = ("_value",)
+
     def __init__(self, value):
         self._value = int(value)
         if self._value < 0:
@@ -227,7 +285,7 @@ class Count(DataType):
 
     def __lt__(self, other):
         res = super().__lt__(other)
-        if res != NotImplemented:
+        if res is not NotImplemented:
             return res
         return self._value < other._value
 
@@ -249,12 +307,14 @@ class Count(DataType):
 
 
 class Integer(DataType):
+    __slots__ = ("_value",)
+
     def __init__(self, value):
         self._value = int(value)
 
     def __lt__(self, other):
         res = super().__lt__(other)
-        if res != NotImplemented:
+        if res is not NotImplemented:
             return res
         return self._value < other._value
 
@@ -276,12 +336,14 @@ class Integer(DataType):
 
 
 class Real(DataType):
+    __slots__ = ("_value",)
+
     def __init__(self, value):
         self._value = float(value)
 
     def __lt__(self, other):
         res = super().__lt__(other)
-        if res != NotImplemented:
+        if res is not NotImplemented:
             return res
         return self._value < other._value
 
@@ -303,7 +365,9 @@ class Real(DataType):
 
 
 class Timespan(DataType):
-    REGEX = re.compile(r"(\d+(\.\d+)?)(ns|ms|s|min|h|d)")
+    __slots__ = ("_value", "_td")
+
+    REGEX = re.compile(r"(\d+(?:\.\d+)?)(ns|ms|s|min|h|d)")
 
     class Unit(enum.Enum):
         """The time unit shorthands supported by Broker."""
@@ -315,6 +379,18 @@ class Timespan(DataType):
         H = "h"
         D = "d"
 
+    # Maps each unit to the timedelta constructor keyword and the divisor that
+    # converts a count of the unit into that keyword's unit. Timedeltas have no
+    # nanoseconds, so those become microseconds.
+    UNIT_TIMEDELTA_ARGS = {
+        Unit.NS.value: ("microseconds", 1e3),
+        Unit.MS.value: ("milliseconds", 1),
+        Unit.S.value: ("seconds", 1),
+        Unit.MIN.value: ("minutes", 1),
+        Unit.H.value: ("hours", 1),
+        Unit.D.value: ("days", 1),
+    }
+
     def __init__(self, value):
         if isinstance(value, datetime.timedelta):
             self._value = Timespan.timedelta_to_broker_timespan(value)
@@ -332,7 +408,7 @@ class Timespan(DataType):
 
     def __lt__(self, other):
         res = super().__lt__(other)
-        if res != NotImplemented:
+        if res is not NotImplemented:
             return res
         return self._td < other._td
 
@@ -353,71 +429,51 @@ class Timespan(DataType):
         return Timespan(cls.broker_to_timedelta(data["data"]))
 
     @classmethod
+    @functools.lru_cache(maxsize=256)
     def broker_to_timedelta(cls, data):
-        """Converts Broker-compatible timespan string into timedelta object."""
+        """Converts Broker-compatible timespan string into timedelta object.
+
+        Timespans tend to repeat (think timeouts and intervals), so this caches
+        its results. The timedelta objects are immutable, making them safe to
+        share.
+        """
         mob = cls.REGEX.fullmatch(data)
         if mob is None:
             raise ValueError(f"'{data}' is not an acceptable Timespan value")
 
-        counter = float(mob[1])
-        unit = Timespan.Unit(mob[3])
-
-        if unit == Timespan.Unit.NS:
-            return datetime.timedelta(microseconds=counter / 1e3)
-        if unit == Timespan.Unit.MS:
-            return datetime.timedelta(milliseconds=counter)
-        if unit == Timespan.Unit.S:
-            return datetime.timedelta(seconds=counter)
-        if unit == Timespan.Unit.MIN:
-            return datetime.timedelta(minutes=counter)
-        if unit == Timespan.Unit.H:
-            return datetime.timedelta(hours=counter)
-        if unit == Timespan.Unit.D:
-            if counter % 7 == 0:
-                return datetime.timedelta(weeks=counter / 7)
-            return datetime.timedelta(days=counter)
-
-        raise AssertionError(f"unhandled timespan unit '{unit}'")
+        # The regex guarantees a known unit, so this lookup succeeds:
+        keyword, divisor = cls.UNIT_TIMEDELTA_ARGS[mob[2]]
+        return datetime.timedelta(**{keyword: float(mob[1]) / divisor})
 
     @classmethod
     def timedelta_to_broker_timespan(cls, tdelta):
         """Converts timedelta object to Broker-compatible timespan string."""
         # We use the smallest unit that's non-zero in the timespan (which has
         # only three relevant members: .microseconds, .seconds, and .days)
-        # and map it to the closest Broker unit.
-
-        def fmt(val, unit):
-            # Don't say 10.0, say 10:
-            val = int(val) if float(val).is_integer() else val
-            return f"{val}{unit}"
+        # and map it to the closest Broker unit. Integer math keeps this exact
+        # even for long timespans in small units.
+        seconds = tdelta.days * 86400 + tdelta.seconds
 
         if tdelta.microseconds != 0:
+            micros = seconds * 1000000 + tdelta.microseconds
             if tdelta.microseconds % 1000 == 0:
-                return fmt(
-                    tdelta.microseconds / 1e3
-                    + tdelta.seconds * 1e3
-                    + tdelta.days * 86400 * 1e3,
-                    "ms",
-                )
+                return f"{micros // 1000}ms"
             # There are no microseconds in the Broker data model,
             # so go full plaid to nanoseconds.
-            return fmt(
-                tdelta.microseconds * 1e3
-                + tdelta.seconds * 1e9
-                + tdelta.days * 86400 * 1e9,
-                "ns",
-            )
+            return f"{micros * 1000}ns"
         if tdelta.seconds != 0:
             if tdelta.seconds % 3600 == 0:
-                return fmt(tdelta.seconds / 3600 + tdelta.days * 24, "h")
+                return f"{seconds // 3600}h"
             if tdelta.seconds % 60 == 0:
-                return fmt(tdelta.seconds / 60 + tdelta.days * 1440, "min")
-            return fmt(tdelta.seconds + tdelta.days * 86400, "s")
+                return f"{seconds // 60}min"
+            return f"{seconds}s"
 
-        return fmt(tdelta.days, "d")
+        return f"{tdelta.days}d"
 
 
 class Timestamp(DataType):
+    __slots__ = ("_value", "_ts")
+
     def __init__(self, value):
         if isinstance(value, datetime.datetime):
             self._value = Timestamp.to_broker_iso8601(value)
@@ -456,19 +512,20 @@ class Timestamp(DataType):
     @classmethod
     def to_broker_iso8601(cls, dtime):
         # The Broker docs say the timestamp looks like this:
-        # "2022-04-10T07:00:00.000" -- meaning that given Python's
-        # microseconds-granularity rendering we need to chop off the last
-        # three digits:
-        return dtime.isoformat(sep="T", timespec="microseconds")[:-3]
+        # "2022-04-10T07:00:00.000" -- meaning millisecond granularity, which
+        # isoformat() renders directly, truncating any further digits:
+        return dtime.isoformat(sep="T", timespec="milliseconds")
 
 
 class String(DataType):
+    __slots__ = ("_value",)
+
     def __init__(self, value):
         self._value = str(value)
 
     def __lt__(self, other):
         res = super().__lt__(other)
-        if res != NotImplemented:
+        if res is not NotImplemented:
             return res
         return self._value < other._value
 
@@ -490,12 +547,14 @@ class String(DataType):
 
 
 class Enum(DataType):
+    __slots__ = ("_value",)
+
     def __init__(self, value):
         self._value = str(value)
 
     def __lt__(self, other):
         res = super().__lt__(other)
-        if res != NotImplemented:
+        if res is not NotImplemented:
             return res
         return self._value < other._value
 
@@ -516,15 +575,32 @@ class Enum(DataType):
         return Enum(data["data"])
 
 
+@functools.lru_cache(maxsize=4096)
+def _ip_address(value):
+    """Parses the given string into an IPv4Address or IPv6Address.
+
+    The same hosts tend to show up over and over in the data the client
+    receives, so this caches the results. It's fine to share them since the
+    ipaddress objects are immutable.
+    """
+    return ipaddress.ip_address(value)
+
+
 class Address(DataType):
+    __slots__ = ("_value", "_addr")
+
     def __init__(self, value):
-        self._value = str(value)  # A str or ipaddress.IPv[46]Address
-        # Throws a derivative of ValueError when not v4/v6 address:
-        self._addr = ipaddress.ip_address(self._value)
+        if isinstance(value, (ipaddress.IPv4Address, ipaddress.IPv6Address)):
+            self._value = str(value)
+            self._addr = value
+        else:
+            self._value = str(value)
+            # Throws a derivative of ValueError when not v4/v6 address:
+            self._addr = _ip_address(self._value)
 
     def __lt__(self, other):
         res = super().__lt__(other)
-        if res != NotImplemented:
+        if res is not NotImplemented:
             return res
         if self._addr.version == other._addr.version:
             return self._addr < other._addr
@@ -550,14 +626,20 @@ class Address(DataType):
 
 
 class Subnet(DataType):
+    __slots__ = ("_value", "_subnet")
+
     def __init__(self, value):
-        self._value = str(value)  # A str or ipaddress.IPv[46]Network
-        # Throws a derivative of ValueError when not v4/v6 network:
-        self._subnet = ipaddress.ip_network(self._value)
+        if isinstance(value, (ipaddress.IPv4Network, ipaddress.IPv6Network)):
+            self._value = str(value)
+            self._subnet = value
+        else:
+            self._value = str(value)
+            # Throws a derivative of ValueError when not v4/v6 network:
+            self._subnet = ipaddress.ip_network(self._value)
 
     def __lt__(self, other):
         res = super().__lt__(other)
-        if res != NotImplemented:
+        if res is not NotImplemented:
             return res
         return self._subnet < other._subnet
 
@@ -579,6 +661,8 @@ class Subnet(DataType):
 
 
 class Port(DataType):
+    __slots__ = ("number", "proto")
+
     class Proto(enum.Enum):
         UNKNOWN = "?"
         TCP = "tcp"
@@ -595,7 +679,7 @@ class Port(DataType):
 
     def __lt__(self, other):
         res = super().__lt__(other)
-        if res != NotImplemented:
+        if res is not NotImplemented:
             return res
         order = ["?", "tcp", "udp", "icmp"]
         if order.index(self.proto.value) < order.index(other.proto.value):
@@ -616,26 +700,34 @@ class Port(DataType):
 
     @classmethod
     def from_broker(cls, data):
-        return Port(
-            data["data"].split("/", 1)[0],
-            Port.Proto(data["data"].split("/", 1)[1]),
-        )
+        number, _, proto = data["data"].partition("/")
+        return Port(number, Port.Proto(proto))
 
 
 class Vector(DataType):
+    __slots__ = ("_elements",)
+
     def __init__(self, elements=None):
-        self._elements = elements or []
-        if not isinstance(self._elements, tuple) and not isinstance(
-            self._elements,
-            list,
-        ):
+        self._elements = [] if elements is None else elements
+        if not isinstance(self._elements, (tuple, list)):
             raise TypeError("Vector initialization requires tuple or list data")
+        if isinstance(self._elements, tuple):
+            # Equality compares the elements directly, so store tuples as lists
+            # to have equal vectors compare equal regardless of the input type.
+            self._elements = list(self._elements)
         if not all(isinstance(elem, Type) for elem in self._elements):
             raise TypeError("Non-empty Vector construction requires brokertype values.")
 
+    @classmethod
+    def _unchecked(cls, elements):
+        """Instantiates a vector from a list known to contain only brokertypes."""
+        res = cls.__new__(cls)
+        res._elements = elements
+        return res
+
     def __lt__(self, other):
         res = super().__lt__(other)
-        if res != NotImplemented:
+        if res is not NotImplemented:
             return res
         for el1, el2 in zip(self._elements, other._elements):
             if el1 < el2:
@@ -667,22 +759,44 @@ class Vector(DataType):
 
     @classmethod
     def from_broker(cls, data):
-        return Vector([from_broker(elem) for elem in data["data"]])
+        return Vector._unchecked([_data_from_broker(elem) for elem in data["data"]])
 
 
 class Set(DataType):
+    __slots__ = ("_elements", "_sorted")
+
     def __init__(self, elements=None):
-        self._elements = elements or set()
-        if not isinstance(self._elements, set):
+        elements = set() if elements is None else elements
+        if not isinstance(elements, set):
             raise TypeError("Set initialization requires set data")
-        if not all(isinstance(elem, Type) for elem in self._elements):
+        if not all(isinstance(elem, Type) for elem in elements):
             raise TypeError("Non-empty Set construction requires brokertype values.")
+        # The set caches its sorted members, see _sorted_elements(), so it keeps
+        # its own copy: the caller may still modify theirs.
+        self._elements = set(elements)
+        self._sorted = None
+
+    @classmethod
+    def _unchecked(cls, elements):
+        """Instantiates a set from a set known to contain only brokertypes.
+
+        The set takes ownership of the given one, which must not change after.
+        """
+        res = cls.__new__(cls)
+        res._elements = elements
+        res._sorted = None
+        return res
+
+    def __eq__(self, other):
+        if self.__class__ != other.__class__:
+            return NotImplemented
+        return self._elements == other._elements
 
     def __lt__(self, other):
         res = super().__lt__(other)
-        if res != NotImplemented:
+        if res is not NotImplemented:
             return res
-        for el1, el2 in zip(sorted(self._elements), sorted(other._elements)):
+        for el1, el2 in zip(self._sorted_elements(), other._sorted_elements()):
             if el1 < el2:
                 return True
         if len(self._elements) < len(other._elements):
@@ -690,7 +804,7 @@ class Set(DataType):
         return False
 
     def __hash__(self):
-        return hash(tuple(sorted(self._elements)))
+        return hash(self._sorted_elements())
 
     def __iter__(self):
         return iter(self._elements)
@@ -701,35 +815,67 @@ class Set(DataType):
     def __contains__(self, key):
         return key in self._elements
 
+    def _sorted_elements(self):
+        """Returns the set's members as a sorted tuple.
+
+        Hashing, comparison, and rendering all need the members in a defined
+        order, so the set sorts them only once. This relies on the members not
+        changing after construction, see __init__() and _unchecked().
+        """
+        if self._sorted is None:
+            self._sorted = tuple(sorted(self._elements))
+        return self._sorted
+
     def to_py(self):
         return {elem.to_py() for elem in self._elements}
 
     def to_broker(self):
         return {
             "@data-type": "set",
-            "data": [elem.to_broker() for elem in sorted(self._elements)],
+            "data": [elem.to_broker() for elem in self._sorted_elements()],
         }
 
     @classmethod
     def from_broker(cls, data):
-        return Set({from_broker(elem) for elem in data["data"]})
+        return Set._unchecked({_data_from_broker(elem) for elem in data["data"]})
 
 
 class Table(DataType):
+    __slots__ = ("_elements", "_sorted")
+
     def __init__(self, elements=None):
-        self._elements = elements or {}
-        if not isinstance(self._elements, dict):
+        elements = {} if elements is None else elements
+        if not isinstance(elements, dict):
             raise TypeError("Table initialization requires dict data")
-        keys_ok = all(isinstance(elem, Type) for elem in self._elements.keys())
-        vals_ok = all(isinstance(elem, Type) for elem in self._elements.values())
+        keys_ok = all(isinstance(elem, Type) for elem in elements.keys())
+        vals_ok = all(isinstance(elem, Type) for elem in elements.values())
         if not keys_ok or not vals_ok:
             raise TypeError("Non-empty Table construction requires brokertype values.")
+        # Like Set, the table keeps its own copy since it caches its sorted keys.
+        self._elements = dict(elements)
+        self._sorted = None
+
+    @classmethod
+    def _unchecked(cls, elements):
+        """Instantiates a table from a dict known to map brokertypes only.
+
+        The table takes ownership of the given dict, which must not change after.
+        """
+        res = cls.__new__(cls)
+        res._elements = elements
+        res._sorted = None
+        return res
+
+    def __eq__(self, other):
+        if self.__class__ != other.__class__:
+            return NotImplemented
+        return self._elements == other._elements
 
     def __lt__(self, other):
         res = super().__lt__(other)
-        if res != NotImplemented:
+        if res is not NotImplemented:
             return res
-        for key1, key2 in zip(sorted(self._elements), sorted(other._elements)):
+        for key1, key2 in zip(self._sorted_keys(), other._sorted_keys()):
             if key1 < key2:
                 return True
             if self._elements[key1] < other._elements[key2]:
@@ -739,7 +885,7 @@ class Table(DataType):
         return False
 
     def __hash__(self):
-        return hash((key, self._elements[key]) for key in sorted(self._elements))
+        return hash(tuple((key, self._elements[key]) for key in self._sorted_keys()))
 
     def __iter__(self):
         return iter(self._elements)
@@ -759,6 +905,16 @@ class Table(DataType):
     def items(self):
         return self._elements.items()
 
+    def _sorted_keys(self):
+        """Returns the table's keys as a sorted tuple.
+
+        Like Set._sorted_elements(), this sorts only once, relying on the table
+        not changing after construction.
+        """
+        if self._sorted is None:
+            self._sorted = tuple(sorted(self._elements))
+        return self._sorted
+
     def to_py(self):
         res = {}
         for key, val in self._elements.items():
@@ -770,15 +926,15 @@ class Table(DataType):
             "@data-type": "table",
             "data": [
                 {"key": key.to_broker(), "value": self._elements[key].to_broker()}
-                for key in sorted(self._elements)
+                for key in self._sorted_keys()
             ],
         }
 
     @classmethod
     def from_broker(cls, data):
-        return Table(
+        return Table._unchecked(
             {
-                from_broker(elem["key"]): from_broker(elem["value"])
+                _data_from_broker(elem["key"]): _data_from_broker(elem["value"])
                 for elem in data["data"]
             },
         )
@@ -799,6 +955,10 @@ class ZeekEvent(Vector):
     https://docs.zeek.org/projects/broker/en/current/web-socket.html#encoding-of-zeek-events
     """
 
+    # The inherited vector elements remain empty, so name and args fully
+    # define an event, including for equality comparison.
+    __slots__ = ("name", "args")
+
     def __init__(self, name, *args):
         super().__init__()
 
@@ -818,7 +978,7 @@ class ZeekEvent(Vector):
                 {
                     "@data-type": "vector",
                     "data": [
-                        String(self.name).to_broker(),
+                        {"@data-type": "string", "data": self.name},
                         {
                             "@data-type": "vector",
                             "data": [arg.to_broker() for arg in self.args],
@@ -855,26 +1015,49 @@ class ZeekEvent(Vector):
         name = data["data"][2]["data"][0]["data"]
         res = ZeekEvent(name)
         for argdata in data["data"][2]["data"][1]["data"]:
-            res.args.append(from_broker(argdata))
+            res.args.append(_data_from_broker(argdata))
         return res
 
 
 # ---- Message types ---------------------------------------------------
 
 
+def _check_required_keys(typ, data):
+    """Raises TypeError when the message data lacks any of typ's required keys.
+
+    A single set difference covers the common case of nothing missing. The error
+    names the first missing key in the order typ declares them.
+    """
+    missing = typ._REQUIRED.keys() - data.keys()
+    if missing:
+        key = next(key for key in typ._REQUIRED if key in missing)
+        raise TypeError(
+            f'invalid data layout for {typ.__name__}: required key "{key}" missing',
+        )
+
+
 class MessageType(Type):
     """Base class for Broker messages."""
 
+    __slots__ = ()
+
+    # The keys a message's Broker data needs to have, see _check_required_keys().
+    # This is a dict so the keys keep their order. Subclasses extend it.
+    _REQUIRED = dict.fromkeys(("type",))
+
     @classmethod
     def check_broker_data(cls, data):
+        # Data that isn't even shaped like a message gets reported as such,
+        # regardless of the message type we expected.
         if not isinstance(data, dict):
             raise TypeError(
-                f"invalid data layout for Broker {cls.__name__}: not an object",
+                "invalid data layout for Broker MessageType: not an object",
             )
         if "type" not in data:
             raise TypeError(
-                f"invalid data layout for Broker {cls.__name__}: required keys missing",
+                "invalid data layout for Broker MessageType: required keys missing",
             )
+        _check_required_keys(cls, data)
 
 
 class HandshakeMessage(MessageType):
@@ -883,11 +1066,13 @@ class HandshakeMessage(MessageType):
     This is just a list of topics to subscribe to. Clients won't receive it.
     """
 
+    __slots__ = ("topics",)
+
     def __init__(self, topics=None):
         self.topics = []
 
         if topics:
-            if not isinstance(topics, tuple) and not isinstance(topics, list):
+            if not isinstance(topics, (tuple, list)):
                 raise TypeError("HandshakeMessage construction requires a topics list")
             for topic in topics:
                 if isinstance(topic, str):
@@ -923,6 +1108,10 @@ class HandshakeAckMessage(MessageType):
     Clients won't need to send this.
     """
 
+    __slots__ = ("endpoint", "version")
+
+    _REQUIRED = dict.fromkeys(("type", "endpoint", "version"))
+
     def __init__(self, endpoint, version):
         self.endpoint = endpoint
         self.version = version
@@ -937,22 +1126,16 @@ class HandshakeAckMessage(MessageType):
             "version": self.version,
         }
 
-    @classmethod
-    def check_broker_data(cls, data):
-        MessageType.check_broker_data(data)
-        for key in ("type", "endpoint", "version"):
-            if key not in data:
-                raise TypeError(
-                    f"invalid data layout for HandshakeAckMessage: "
-                    f'required key "{key}" missing',
-                )
-
     @classmethod
     def from_broker(cls, data):
         return HandshakeAckMessage(data["endpoint"], data["version"])
 
 
 class DataMessage(MessageType):
+    __slots__ = ("topic", "data")
+
+    _REQUIRED = dict.fromkeys(("type", "topic", "@data-type", "data"))
+
     def __init__(self, topic, data):
         self.topic = topic
         self.data = data
@@ -970,25 +1153,18 @@ class DataMessage(MessageType):
             "data": bdata["data"],
         }
 
-    @classmethod
-    def check_broker_data(cls, data):
-        MessageType.check_broker_data(data)
-        for key in ("type", "topic", "@data-type", "data"):
-            if key not in data:
-                raise TypeError(
-                    f"invalid data layout for DataMessage: "
-                    f'required key "{key}" missing',
-                )
-
     @classmethod
     def from_broker(cls, data):
-        return DataMessage(
-            data["topic"],
-            from_broker({"@data-type": data["@data-type"], "data": data["data"]}),
-        )
+        # The message carries its payload's "@data-type" and "data" keys
+        # directly, so it can serve as the payload's Broker data as-is.
+        return DataMessage(data["topic"], _data_from_broker(data))
 
 
 class ErrorMessage(Type):
+    __slots__ = ("code", "context")
+
+    _REQUIRED = dict.fromkeys(("type", "code", "context"))
+
     def __init__(self, code, context):
         self.code = code  # A string representation of a Broker error code
         self.context = context
@@ -1006,12 +1182,7 @@ class ErrorMessage(Type):
     @classmethod
     def check_broker_data(cls, data):
         MessageType.check_broker_data(data)
-        for key in ("type", "code", "context"):
-            if key not in data:
-                raise TypeError(
-                    f"invalid data layout for ErrorMessage: "
-                    f'required key "{key}" missing',
-                )
+        _check_required_keys(cls, data)
 
     @classmethod
     def from_broker(cls, data):
@@ -1055,9 +1226,11 @@ def unserialize(data):
     This assumes the message content in JSON and first unserializes it into a
     Python data structure. It then calls from_python() to instantiate an object
     of the appropriate class from it.
+
+    data: raw wire WebSocket message content, as str or UTF-8 bytes.
     """
     try:
-        obj = json.loads(data)
+        obj = _json_loads(data)
     except json.JSONDecodeError as err:
         raise TypeError(f"cannot parse JSON data: {err.msg} -- {data}") from err
 
@@ -1079,12 +1252,26 @@ def from_broker(data):
     if not isinstance(data, dict):
         raise TypeError("invalid data layout for Broker data: not an object")
 
+    # Broker data has no "type" key, so look that up without raising for it.
+    typ = _broker_messagemap.get(data.get("type"))
+    if typ is None:
+        return _data_from_broker(data)
+
+    typ.check_broker_data(data)
     try:
-        typ = _broker_messagemap[data["type"]]
-        typ.check_broker_data(data)
         return typ.from_broker(data)
-    except KeyError:
-        pass
+    except KeyError as err:
+        raise TypeError(f"invalid data for {typ.__name__}: {data}") from err
+
+
+def _data_from_broker(data):
+    """Like from_broker(), for data that cannot be a Broker message.
+
+    Members of composite types are always Broker data, so this spares their
+    instantiation the message type lookup that from_broker() attempts first.
+    """
+    if not isinstance(data, dict):
+        raise TypeError("invalid data layout for Broker data: not an object")
 
     try:
         typ = _broker_typemap[data["@data-type"]]
@@ -1118,6 +1305,47 @@ _python_typemap = {
 }
 
 
+def _infer_from_py(data):
+    """Like from_py(), for data whose type is always inferred.
+
+    Members of composite types never come with an explicit type, so this spares
+    their conversion the argument handling in from_py().
+    """
+    typ = _python_typemap.get(type(data))
+    if typ is None:
+        raise TypeError(f"cannot map Python type {type(data)} to Broker type")
+
+    return _python_handlers.get(typ, typ)(data)
+
+
+# The following build the members of composite types first, since these types
+# don't expect their content to change after construction. The members are
+# brokertypes by construction, so they need no further checking.
+
+
+def _table_from_py(data):
+    return Table._unchecked(
+        {_infer_from_py(key): _infer_from_py(val) for key, val in data.items()},
+    )
+
+
+def _vector_from_py(data):
+    return Vector._unchecked([_infer_from_py(elem) for elem in data])
+
+
+def _set_from_py(data):
+    return Set._unchecked({_infer_from_py(elem) for elem in data})
+
+
+# Brokertypes that from_py() instantiates via a handler function instead of
+# their constructor, because they need recursive conversion of their members.
+_python_handlers = {
+    Set: _set_from_py,
+    Table: _table_from_py,
+    Vector: _vector_from_py,
+}
+
+
 def from_py(data, typ=None, check_none=True):
     """Instantiates a brokertype object from the given Python data.
 
@@ -1151,37 +1379,12 @@ def from_py(data, typ=None, check_none=True):
     if data is None and check_none:
         return NoneType()
 
-    if typ is not None:
-        if not issubclass(typ, Type):
-            raise TypeError(f"not a brokertype: {typ.__name__}")
-    else:
-        try:
-            typ = _python_typemap[type(data)]
-        except KeyError as err:
-            raise TypeError(
-                f"cannot map Python type {type(data)} to Broker type",
-            ) from err
+    if typ is None:
+        return _infer_from_py(data)
 
-    if typ == Table:
-        res = Table()
-        for key, val in data.items():
-            res._elements[from_py(key)] = from_py(
-                val,
-            )
-        return res
-
-    if typ == Vector:
-        res = Vector()
-        for elem in data:
-            res._elements.append(from_py(elem))
-        return res
-
-    if typ == Set:
-        res = Set()
-        for elem in data:
-            res._elements.add(from_py(elem))
-        return res
+    if not issubclass(typ, Type):
+        raise TypeError(f"not a brokertype: {typ.__name__}")
 
-    # For others the constructors of the types in this module should naturally
-    # work with the provided value.
-    return typ(data)
+    # For types without a handler the constructors of the types in this module
+    # should naturally work with the provided value.
+    return _python_handlers.get(typ, typ)(data)
@@ -11,8 +11,6 @@ import traceback
 from . import brokertypes as bt
 from .config import CONFIG
 from .consts import CONFIG_FILE
-from .controller import Controller
-from .controller import Error as ControllerError
 from .events import (
     DeployRequest,
     DeployResponse,
@@ -83,6 +81,12 @@ def json_dumps(obj):
 
 
 def create_controller():
+    # Only commands that talk to the controller need the controller module,
+    # and with it websocket-client and the ssl module. Importing it here keeps
+    # it off the path of commands such as show-settings and --help.
+    from .controller import Controller
+    from .controller import Error as ControllerError
+
     try:
         ctl = Controller()
     except ControllerError as err:
@@ -6,7 +6,7 @@ LOG = logging.getLogger(__name__)
 LOG.addHandler(logging.NullHandler())
 
 
-def configure(verbosity=0, rich_logging=False, stream=None):
+def configure(verbosity=0, rich_logging=False, stream=None, handler=None):
     """Configures logging.
 
     Args:
@@ -14,6 +14,11 @@ def configure(verbosity=0, rich_logging=False, stream=None):
             values make no difference.
 
         rich_logging (bool): whether to use timestamped, log-style log formatting.
+
+        stream: the stream the default handler writes to. Defaults to stderr.
+
+        handler (logging.Handler): a handler to use instead of the default
+            stream handler. It receives the same formatting.
     """
     # Make log levels lower-case, looks better in informal logging
     for level in (logging.ERROR, logging.WARNING, logging.INFO, logging.DEBUG):
@@ -27,7 +32,8 @@ def configure(verbosity=0, rich_logging=False, stream=None):
     else:
         formatter = logging.Formatter("%(levelname)s: %(message)s")
 
-    handler = logging.StreamHandler(stream=stream)
+    if handler is None:
+        handler = logging.StreamHandler(stream=stream)
     handler.setFormatter(formatter)
 
     LOG.setLevel(logging.ERROR)
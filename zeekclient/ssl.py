@@ -6,6 +6,32 @@ import ssl
 from .config import CONFIG
 
 
+def _get_settings():
+    """Returns the configured SSL settings, validating any given paths.
+
+    Unset settings are None. This raises FileNotFoundError when a configured
+    certificate, key, or CA file or directory does not exist.
+
+    Returns: tuple of certificate, keyfile, cafile, capath, and passphrase.
+    """
+    ssl_certificate = CONFIG.get("ssl", "certificate") or None
+    ssl_keyfile = CONFIG.get("ssl", "keyfile") or None
+    ssl_cafile = CONFIG.get("ssl", "cafile") or None
+    ssl_capath = CONFIG.get("ssl", "capath") or None
+    ssl_passphrase = CONFIG.get("ssl", "passphrase") or None
+
+    if ssl_certificate and not os.path.isfile(ssl_certificate):
+        raise FileNotFoundError(f'SSL certificate file "{ssl_certificate}" not found')
+    if ssl_keyfile and not os.path.isfile(ssl_keyfile):
+        raise FileNotFoundError(f'SSL private key file "{ssl_keyfile}" not found')
+    if ssl_cafile and not os.path.isfile(ssl_cafile):
+        raise FileNotFoundError(f'SSL trusted CAs file "{ssl_cafile}" not found')
+    if ssl_capath and not os.path.isdir(ssl_capath):
+        raise FileNotFoundError(f'SSL trusted CAs path "{ssl_capath}" not found')
+
+    return ssl_certificate, ssl_keyfile, ssl_cafile, ssl_capath, ssl_passphrase
+
+
 def get_context():  # pragma: no cover
     """Returns an ssl.SSLContext for TLS-protected websocket communication.
 
@@ -28,20 +54,13 @@ def get_context():  # pragma: no cover
     else:
         ctx = ssl.SSLContext(ssl.PROTOCOL_TLS)
 
-    ssl_certificate = CONFIG.get("ssl", "certificate") or None
-    ssl_keyfile = CONFIG.get("ssl", "keyfile") or None
-    ssl_cafile = CONFIG.get("ssl", "cafile") or None
-    ssl_capath = CONFIG.get("ssl", "capath") or None
-    ssl_passphrase = CONFIG.get("ssl", "passphrase") or None
-
-    if ssl_certificate and not os.path.isfile(ssl_certificate):
-        raise FileNotFoundError(f'SSL certificate file "{ssl_certificate}" not found')
-    if ssl_keyfile and not os.path.isfile(ssl_keyfile):
-        raise FileNotFoundError(f'SSL private key file "{ssl_keyfile}" not found')
-    if ssl_cafile and not os.path.isfile(ssl_cafile):
-        raise FileNotFoundError(f'SSL trusted CAs file "{ssl_cafile}" not found')
-    if ssl_capath and not os.path.isdir(ssl_capath):
-        raise FileNotFoundError(f'SSL trusted CAs path "{ssl_capath}" not found')
+    (
+        ssl_certificate,
+        ssl_keyfile,
+        ssl_cafile,
+        ssl_capath,
+        ssl_passphrase,
+    ) = _get_settings()
 
     if not ssl_certificate:
         ctx.check_hostname = False
@@ -69,20 +88,13 @@ def get_websocket_sslopt():
     yet support passing an SSL context explicitly. This can go when everyone can
     easily use websocket-client >= 1.2.2.
     """
-    ssl_certificate = CONFIG.get("ssl", "certificate") or None
-    ssl_keyfile = CONFIG.get("ssl", "keyfile") or None
-    ssl_cafile = CONFIG.get("ssl", "cafile") or None
-    ssl_capath = CONFIG.get("ssl", "capath") or None
-    ssl_passphrase = CONFIG.get("ssl", "passphrase") or None
-
-    if ssl_certificate and not os.path.isfile(ssl_certificate):
-        raise FileNotFoundError(f'SSL certificate file "{ssl_certificate}" not found')
-    if ssl_keyfile and not os.path.isfile(ssl_keyfile):
-        raise FileNotFoundError(f'SSL private key file "{ssl_keyfile}" not found')
-    if ssl_cafile and not os.path.isfile(ssl_cafile):
-        raise FileNotFoundError(f'SSL trusted CAs file "{ssl_cafile}" not found')
-    if ssl_capath and not os.path.isdir(ssl_capath):
-        raise FileNotFoundError(f'SSL trusted CAs path "{ssl_capath}" not found')
+    (
+        ssl_certificate,
+        ssl_keyfile,
+        ssl_cafile,
+        ssl_capath,
+        ssl_passphrase,
+    ) = _get_settings()
 
     # SSL options as understood by websocket-client
     sslopt = {}